@@ -0,0 +1,106 @@
+"""
+Benchmark the NLP profiles: throughput and recall per profile against a labeled sample set.
+
+    python benchmarks/profiles.py [--samples benchmarks/samples.jsonl] [--profile fast ...] [--repeat 5]
+
+Each line of the sample set is a JSON object with the document `text` and its `entities`,
+a list of {"text": <substring of the document>, "category": names|dates|phones|addresses}.
+An entity counts as recalled when every non-whitespace character of it is redacted.
+Profiles whose models are not installed are skipped.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from redactor import (PROFILES, initialize_hf_pipeline, initialize_spacy_nlp, load_profiles,  # noqa: E402
+                      merge_overlapping_spans, redact_email_headers, redact_entities_hf, redact_entities_regex,
+                      redact_entities_spacy)
+
+CATEGORIES = ('names', 'dates', 'phones', 'addresses')
+
+def load_samples(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+def redact_spans(text, profile):
+    """
+    Spans found by the same detectors process_file runs, for every category.
+    """
+    stats = {'names': 0, 'dates': 0, 'phones': 0, 'addresses': 0}
+    spans = []
+    spans.extend(redact_email_headers(text, CATEGORIES, stats))
+    spans.extend(redact_entities_regex(text, CATEGORIES, stats))
+    spans.extend(redact_entities_spacy(text, CATEGORIES, stats, profile=profile))
+    spans.extend(redact_entities_hf(text, CATEGORIES, stats, profile=profile))
+    return merge_overlapping_spans(spans)
+
+def is_recalled(text, entity, spans):
+    start = text.find(entity)
+    if start == -1:
+        raise ValueError(f"Entity {entity!r} not found in sample text")
+    covered = set()
+    for span_start, span_end in spans:
+        covered.update(range(max(span_start, start), min(span_end, start + len(entity))))
+    return all(i in covered for i in range(start, start + len(entity)) if not text[i].isspace())
+
+def benchmark_profile(profile, samples, repeat):
+    # Load the models up front so model loading isn't counted as throughput
+    initialize_spacy_nlp(profile)
+    initialize_hf_pipeline(profile)
+
+    found = {category: 0 for category in CATEGORIES}
+    total = {category: 0 for category in CATEGORIES}
+    for sample in samples:
+        spans = redact_spans(sample['text'], profile)
+        for entity in sample['entities']:
+            total[entity['category']] += 1
+            found[entity['category']] += is_recalled(sample['text'], entity['text'], spans)
+
+    chars = sum(len(sample['text']) for sample in samples) * repeat
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for sample in samples:
+            redact_spans(sample['text'], profile)
+    elapsed = time.perf_counter() - start
+
+    recall = {category: found[category] / total[category] for category in CATEGORIES if total[category]}
+    recall['all'] = sum(found.values()) / max(sum(total.values()), 1)
+    return {'chars_per_second': chars / elapsed if elapsed else float('inf'), 'recall': recall}
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark throughput and recall per NLP profile.")
+    parser.add_argument('--samples', default=os.path.join(os.path.dirname(os.path.abspath(__file__)), 'samples.jsonl'),
+                        help='Labeled sample set (JSON lines)')
+    parser.add_argument('--profile', action='append', help='Profile to benchmark (repeatable, default: all)')
+    parser.add_argument('--profile-config', help='JSON file defining extra profiles or overriding the built-in ones')
+    parser.add_argument('--repeat', type=int, default=5, help='Passes over the sample set for the throughput timing')
+    parser.add_argument('--json', action='store_true', help='Print the results as JSON')
+    args = parser.parse_args()
+
+    if args.profile_config:
+        load_profiles(args.profile_config)
+    samples = load_samples(args.samples)
+
+    results = {}
+    for profile in args.profile or list(PROFILES):
+        try:
+            results[profile] = benchmark_profile(profile, samples, args.repeat)
+        except Exception as e:
+            sys.stderr.write(f"Skipping profile {profile}: {e}\n")
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    columns = CATEGORIES + ('all',)
+    print(f"{'profile':<10} {'chars/s':>12} " + ' '.join(f"{column:>9}" for column in columns))
+    for profile, result in results.items():
+        recall = ' '.join(f"{result['recall'][column]:>9.1%}" if column in result['recall'] else f"{'-':>9}"
+                          for column in columns)
+        print(f"{profile:<10} {result['chars_per_second']:>12,.0f} {recall}")
+
+if __name__ == "__main__":
+    main()
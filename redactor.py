@@ -1,27 +1,61 @@
 import argparse
+import bz2
 import glob
+import gzip
+import hashlib
+import itertools
+import json
+import lzma
+import mailbox
 import os
 import re
 import sys
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
 from warnings import filterwarnings
 
+import phonenumbers
 import spacy
+from phonenumbers import Leniency, PhoneNumberMatcher
 from transformers import AutoModelForTokenClassification, AutoTokenizer, pipeline
 
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+try:
+    import re2
+except ImportError:
+    re2 = None
+
 # Suppress all warnings
 filterwarnings('ignore')
 
-# Define custom token patterns for phone numbers
-PHONE_PATTERNS = [
-    # Different phone number formats (e.g., 123-456-7890, (123) 456-7890)
-    {"label": "PHONE", "pattern": [{"SHAPE": "ddd"}, {"ORTH": "-"}, {"SHAPE": "ddd"}, {"ORTH": "-"}, {"SHAPE": "dddd"}]},
-    {"label": "PHONE", "pattern": [{"ORTH": "("}, {"SHAPE": "ddd"}, {"ORTH": ")"}, {"SHAPE": "ddd"}, {"ORTH": "-"}, {"SHAPE": "dddd"}]},
-    {"label": "PHONE", "pattern": [{"ORTH": "+"}, {"SHAPE": "d"}, {"IS_SPACE": True}, {"SHAPE": "ddd"}, {"ORTH": "-"}, {"SHAPE": "ddd"}, {"ORTH": "-"}, {"SHAPE": "dddd"}]},
-    {"label": "PHONE", "pattern": [{"SHAPE": "d"}, {"ORTH": "-"}, {"SHAPE": "ddd"}, {"ORTH": "-"}, {"SHAPE": "ddd"}, {"ORTH": "-"}, {"SHAPE": "dddd"}]},
-    {"label": "PHONE", "pattern": [{"SHAPE": "ddd"}, {"ORTH": "."}, {"SHAPE": "ddd"}, {"ORTH": "."}, {"SHAPE": "dddd"}]},
-    {"label": "PHONE", "pattern": [{"SHAPE": "ddd"}, {"IS_SPACE": True}, {"SHAPE": "ddd"}, {"IS_SPACE": True}, {"SHAPE": "dddd"}]},
-    {"label": "PHONE", "pattern": [{"SHAPE": "dddddddddd"}]},
-]
+# Streaming compression codecs: codec name -> (file extension, magic bytes pattern)
+COMPRESSION_CODECS = {
+    'gz': ('.gz', re.compile(rb'\x1f\x8b')),
+    # "BZh", the block size digit, then the block header magic (BCD pi)
+    'bz2': ('.bz2', re.compile(rb'BZh[1-9]1AY&SY')),
+    'xz': ('.xz', re.compile(rb'\xfd7zXZ\x00')),
+    'zst': ('.zst', re.compile(rb'\x28\xb5\x2f\xfd')),
+}
+
+# Longest magic bytes header to read when sniffing a codec
+MAGIC_BYTES = 10
+
+# Extensions of plain text inputs, which are never sniffed for compression magic bytes
+TEXT_EXTENSIONS = ('.txt', '.text', '.md', '.csv', '.tsv', '.log', '.json', '.xml', '.html', '.eml', '.mbox')
+
+# Valid --compress-level range per codec
+COMPRESSION_LEVELS = {
+    'gz': (0, 9),
+    'bz2': (1, 9),
+    'xz': (0, 9),
+    'zst': (1, 22),
+}
 
 # Define custom token patterns for dates
 DATE_PATTERNS = [
@@ -56,36 +90,545 @@ NAME_PATTERNS = [
     {"label": "PERSON", "pattern": [{"IS_TITLE": True}, {"IS_TITLE": True, "OP": "+"}]},
 ]
 
-def initialize_spacy_nlp():
+# Accuracy/speed profiles for the NLP stack. Every profile also runs the header and regex detectors.
+#   fast:     rules only - blank tokenizer with the entity ruler, no statistical models
+#   balanced: small SpaCy pipeline without word vectors, unused components excluded, no transformer
+#   thorough: large SpaCy pipeline plus the Hugging Face BERT NER model
+PROFILES = {
+    'fast': {
+        'spacy_model': None,
+        'spacy_exclude': [],
+        'sentencizer': False,
+        'hf_model': None,
+        'spacy_batch_size': 256,
+        'hf_batch_size': 0,
+    },
+    'balanced': {
+        'spacy_model': 'en_core_web_sm',
+        'spacy_exclude': ['tagger', 'parser', 'attribute_ruler', 'lemmatizer'],
+        'sentencizer': False,
+        'hf_model': None,
+        'spacy_batch_size': 128,
+        'hf_batch_size': 0,
+    },
+    'thorough': {
+        'spacy_model': 'en_core_web_lg',
+        'spacy_exclude': [],
+        'sentencizer': True,
+        'hf_model': 'dslim/bert-base-NER',
+        'spacy_batch_size': 32,
+        'hf_batch_size': 16,
+    },
+}
+
+PROFILE_SETTINGS = ('spacy_model', 'spacy_exclude', 'sentencizer', 'hf_model', 'spacy_batch_size', 'hf_batch_size')
+
+# Header fields that carry address lists, redacted structurally in mailbox mode.
+# Resent-* fields are matched by prefix; Received is handled separately for its "for <address>" clause.
+ADDRESS_HEADERS = {
+    'from', 'to', 'cc', 'bcc', 'reply-to', 'sender', 'return-path', 'delivered-to', 'envelope-to',
+    'x-original-to', 'x-from', 'x-to', 'x-cc', 'x-bcc'
+}
+
+# Counters summed across files, shards and stats reports
+STATS_COUNTERS = ('names', 'dates', 'phones', 'addresses', 'concepts', 'degraded')
+
+# Version of the machine-readable stats format written by --stats-json
+STATS_JSON_VERSION = 1
+
+# Detector regular expressions: name -> (pattern, flags). They are compiled with compile_pattern
+# so the engine selected with --regex-engine is used.
+DETECTOR_PATTERNS = {
+    'name': (r'\b[A-Z][a-z]+(?:\s[A-Z][a-z]+)+\b', 0),
+    # The lookaheads cap local parts at 64 characters (RFC 5321) so long '@'-less runs
+    # can't make re rescan to the end of the run from every word boundary
+    'email_name': (r'\b(?=[a-z._]{1,64}@)([a-z]+(?:[\._][a-z]+)+)@[\w\.-]+\b', re.IGNORECASE),
+    # Candidate phone numbers: digit runs with the separators phone numbers are written with.
+    # phonenumbers validates them; word-adjacent numbers are dropped in Python to keep the pattern RE2-compatible
+    'phone_candidate': (r'\+?\(?\d[\d() .\t-]{5,22}\d', 0),
+    'date': (
+        r'\b(?:\d{1,2}[/-])?\d{1,2}[/-]\d{2,4}\b|'
+        r'\b(?:Jan(?:uary)?|Feb(?:ruary)?|Mar(?:ch)?|Apr(?:il)?|May|Jun(?:e)?|Jul(?:y)?|Aug(?:ust)?|'
+        r'Sep(?:tember)?|Oct(?:ober)?|Nov(?:ember)?|Dec(?:ember)?)\s\d{1,2},?\s\d{4}\b',
+        re.IGNORECASE
+    ),
+    'address': (
+        r'('
+        r'\b\d{1,5}\s+(?:[A-Z][a-zA-Z]*(?:\s|$)){1,5}'
+        r'(?:Street|St\.?|Avenue|Ave\.?|Road|Rd\.?|Boulevard|Blvd\.?|'
+        r'Lane|Ln\.?|Drive|Dr\.?|Court|Ct\.?|Highway|Hwy\.?|Place|Pl\.?|'
+        r'Square|Sq\.?|Building|Bldg\.?|Apartment|Apt\.?|Suite|Ste\.?)?'
+        r')',
+        re.IGNORECASE
+    ),
+    'header': (r'^(From|To|Cc|Bcc|X-From|X-To|X-cc|X-bcc):\s*(.*)', re.IGNORECASE | re.MULTILINE),
+    'header_name': (r'\b[A-Z][a-z]+(?:\s[A-Z][a-z]+)*\b', 0),
+    'header_email': (r'\b(?=[\w.-]{1,64}@)([\w\.-]+)@([\w\.-]+\.\w+)\b', re.IGNORECASE),
+    'received_for': (r'\bfor\s+<?([^\s<>;@]+)@', re.IGNORECASE),
+    'sentence': (r'.+?(?:[.!?](?=\s)|\n|$)', re.DOTALL),
+}
+
+# Flags RE2 understands, as inline modifiers; patterns with other flags stay on re
+RE2_INLINE_FLAGS = {re.IGNORECASE: 'i', re.MULTILINE: 'm', re.DOTALL: 's'}
+
+# RE2's \s, \d and \w are ASCII-only; these class bodies match what Python's Unicode classes match
+RE2_UNICODE_CLASSES = {
+    's': r'\s\x{0b}\x{1c}-\x{1f}\x{85}\p{Z}',
+    'd': r'\p{Nd}',
+    'w': r'\p{L}\p{N}_',
+}
+
+# A \b or \B escape (not a literal backslash followed by b); RE2's word boundaries are ASCII-only
+WORD_BOUNDARY_ESCAPE = re.compile(r'(?<!\\)(?:\\\\)*\\[bB]')
+
+REGEX_ENGINES = ('re', 're2', 'auto')
+
+_regex_engine = 're'
+_phone_region = 'US'
+_compiled_patterns = {}
+# Number of open Redactors using each profile's cached pipelines
+_model_users = {}
+
+# Mapping of entity labels to redaction categories
+SPACY_LABEL_MAPPING = {
+    'PERSON': 'names',
+    'DATE': 'dates',
+    'GPE': 'addresses',
+    'LOC': 'addresses'
+}
+
+HF_LABEL_MAPPING = {
+    'PER': 'names',
+    'LOC': 'addresses'
+}
+
+# Characters per NLP call when a deadline is set; the deadline is checked between chunks.
+# Each chunk also sees DEADLINE_CHUNK_OVERLAP characters of the next one so boundary entities are not cut.
+DEADLINE_CHUNK_SIZE = 10000
+DEADLINE_CHUNK_OVERLAP = 500
+
+# apply_redactions joins its output slices into a block string every this many pieces
+REDACTION_BLOCK_PIECES = 4096
+
+# Phone candidates need at least this many digits before phonenumbers is asked about them
+PHONE_MIN_DIGITS = 7
+# Characters that make a phone candidate formatted; bare digit runs must be valid numbers, not just possible ones
+PHONE_SEPARATORS = frozenset('+() .-\t')
+# Characters that mark a digit run as part of an ID, amount or path rather than a phone number
+PHONE_ADJACENT_REJECT = frozenset('_$€£/%')
+
+# Entity categories that can be targeted
+TARGETS = ('names', 'dates', 'phones', 'addresses')
+
+# Guards loading, releasing and running the cached NLP pipelines when they are shared across threads
+MODEL_LOCK = threading.RLock()
+
+RedactionResult = namedtuple('RedactionResult', ['text', 'spans', 'stats'])
+
+class DeadlineExceeded(Exception):
+    """
+    Raised by an NLP detector when a document's time budget runs out, carrying the spans found so far.
+    """
+    def __init__(self, spans):
+        super().__init__("time budget exhausted")
+        self.spans = spans
+
+class WordBoundaryPattern:
+    """
+    A pattern using \\b or \\B compiled for both engines. RE2's word boundaries only know ASCII word
+    characters, so RE2 runs on ASCII text and re on anything else.
+    """
+    def __init__(self, re2_pattern, re_pattern):
+        self.re2_pattern = re2_pattern
+        self.re_pattern = re_pattern
+        self.pattern = re_pattern.pattern
+
+    def engine_for(self, string):
+        return self.re2_pattern if string.isascii() else self.re_pattern
+
+    def search(self, string, *args):
+        return self.engine_for(string).search(string, *args)
+
+    def match(self, string, *args):
+        return self.engine_for(string).match(string, *args)
+
+    def fullmatch(self, string, *args):
+        return self.engine_for(string).fullmatch(string, *args)
+
+    def finditer(self, string, *args):
+        return self.engine_for(string).finditer(string, *args)
+
+    def findall(self, string, *args):
+        return self.engine_for(string).findall(string, *args)
+
+    def split(self, string, *args):
+        return self.engine_for(string).split(string, *args)
+
+    def sub(self, repl, string, *args):
+        return self.engine_for(string).sub(repl, string, *args)
+
+def get_profile(name):
+    """
+    Return the settings of a named accuracy/speed profile.
+    """
+    try:
+        return PROFILES[name]
+    except KeyError:
+        raise ValueError(f"Unknown profile: {name}. Choose from: {', '.join(sorted(PROFILES))}")
+
+def load_profiles(config_path):
+    """
+    Load extra or overriding profiles from a JSON file mapping profile names to settings.
+    A profile may set 'base' to start from an existing profile and override only some settings.
+    """
+    with open(config_path, 'r', encoding='utf-8') as f:
+        config = json.load(f)
+    for name, settings in config.items():
+        settings = dict(settings)
+        base = settings.pop('base', name if name in PROFILES else None)
+        profile = dict(get_profile(base)) if base else {}
+        profile.update(settings)
+        unknown = sorted(set(profile) - set(PROFILE_SETTINGS))
+        missing = sorted(set(PROFILE_SETTINGS) - set(profile))
+        if unknown or missing:
+            raise ValueError(f"Profile {name}: unknown settings {unknown}, missing settings {missing}")
+        PROFILES[name] = profile
+
+def initialize_spacy_nlp(profile='thorough'):
+    """
+    Initialize and return the SpaCy NLP pipeline of a profile with custom patterns for redaction.
+    Each profile's pipeline is loaded only once (lazy loading) for efficiency.
+    """
+    with MODEL_LOCK:
+        if not hasattr(initialize_spacy_nlp, "pipelines"):
+            initialize_spacy_nlp.pipelines = {}
+        if profile not in initialize_spacy_nlp.pipelines:
+            settings = get_profile(profile)
+            model_name = settings['spacy_model']
+            if model_name is None:
+                # Rules only: a blank tokenizer plus the entity ruler
+                nlp = spacy.blank('en')
+                entity_ruler = nlp.add_pipe("entity_ruler")
+            else:
+                try:
+                    nlp = spacy.load(model_name, exclude=settings['spacy_exclude'])
+                except OSError as e:
+                    sys.stderr.write(
+                        f"SpaCy model '{model_name}' not found. Install it with: python -m spacy download {model_name}\n"
+                    )
+                    raise e
+                # Add entity ruler for custom patterns before the named entity recognizer (NER)
+                entity_ruler = nlp.add_pipe("entity_ruler", before="ner")
+            entity_ruler.add_patterns(DATE_PATTERNS + ADDRESS_PATTERNS + NAME_PATTERNS)
+            if settings['sentencizer']:
+                nlp.add_pipe('sentencizer')  # Adds sentence segmentation
+            initialize_spacy_nlp.pipelines[profile] = nlp
+        return initialize_spacy_nlp.pipelines[profile]
+
+def initialize_hf_pipeline(profile='thorough'):
+    """
+    Initialize and return the Hugging Face NER pipeline of a profile, or None if the profile doesn't use one.
+    Each profile's pipeline is loaded only once for efficiency.
+    """
+    with MODEL_LOCK:
+        if not hasattr(initialize_hf_pipeline, "pipelines"):
+            initialize_hf_pipeline.pipelines = {}
+        if profile not in initialize_hf_pipeline.pipelines:
+            model_name = get_profile(profile)['hf_model']
+            ner_pipeline = None
+            if model_name is not None:
+                tokenizer = AutoTokenizer.from_pretrained(model_name)
+                model = AutoModelForTokenClassification.from_pretrained(model_name)
+                ner_pipeline = pipeline("ner", model=model, tokenizer=tokenizer, aggregation_strategy="simple")
+            initialize_hf_pipeline.pipelines[profile] = ner_pipeline
+        return initialize_hf_pipeline.pipelines[profile]
+
+def release_models(profile):
+    """
+    Drop a profile's cached SpaCy and Hugging Face pipelines so their memory can be reclaimed.
+    They are loaded again the next time they are needed.
+    """
+    with MODEL_LOCK:
+        getattr(initialize_spacy_nlp, "pipelines", {}).pop(profile, None)
+        getattr(initialize_hf_pipeline, "pipelines", {}).pop(profile, None)
+
+def set_regex_engine(engine):
+    """
+    Select the regex engine used by the detectors: 're' (default), 're2' (linear-time, requires
+    google-re2) or 'auto' (re2 when installed, otherwise re).
+    """
+    global _regex_engine
+    if engine not in REGEX_ENGINES:
+        raise ValueError(f"Unknown regex engine: {engine}")
+    if engine == 're2' and re2 is None:
+        raise RuntimeError("google-re2 is required for the re2 engine. Install it with: pip install google-re2")
+    _regex_engine = engine
+    _compiled_patterns.clear()
+
+def to_re2_syntax(pattern):
+    """
+    Rewrite \\s, \\d and \\w in a pattern to RE2 Unicode classes so RE2 matches what re matches.
+    """
+    translated = []
+    in_class = False
+    i = 0
+    while i < len(pattern):
+        char = pattern[i]
+        if char == '\\' and i + 1 < len(pattern):
+            escape = pattern[i + 1]
+            if escape in RE2_UNICODE_CLASSES:
+                body = RE2_UNICODE_CLASSES[escape]
+                translated.append(body if in_class else f"[{body}]")
+            else:
+                translated.append(pattern[i:i + 2])
+            i += 2
+            continue
+        if char == '[' and not in_class:
+            in_class = True
+            translated.append(char)
+            # A ']' straight after '[' or '[^' is a literal
+            if pattern[i + 1:i + 2] == '^':
+                translated.append('^')
+                i += 1
+            if pattern[i + 1:i + 2] == ']':
+                translated.append(']')
+                i += 1
+        elif char == ']' and in_class:
+            in_class = False
+            translated.append(char)
+        else:
+            translated.append(char)
+        i += 1
+    return ''.join(translated)
+
+def compile_pattern(pattern, flags=0):
+    """
+    Compile a detector pattern with the selected regex engine, caching the result.
+    Patterns RE2 cannot handle (lookarounds, backreferences, other flags) fall back to re, and
+    patterns with word boundaries only use RE2 on ASCII text.
+    """
+    key = (pattern, flags)
+    if key not in _compiled_patterns:
+        compiled = None
+        unsupported_flags = flags & ~sum(RE2_INLINE_FLAGS)
+        if _regex_engine != 're' and re2 is not None and not unsupported_flags:
+            inline = ''.join(letter for flag, letter in RE2_INLINE_FLAGS.items() if flags & flag)
+            options = re2.Options()
+            options.log_errors = False
+            try:
+                re2_pattern = to_re2_syntax(pattern)
+                compiled = re2.compile(f"(?{inline}){re2_pattern}" if inline else re2_pattern, options)
+            except re2.error:
+                compiled = None
+        if compiled is not None and WORD_BOUNDARY_ESCAPE.search(pattern):
+            compiled = WordBoundaryPattern(compiled, re.compile(pattern, flags))
+        _compiled_patterns[key] = compiled or re.compile(pattern, flags)
+    return _compiled_patterns[key]
+
+def detector_pattern(name):
+    """
+    Return the compiled detector pattern registered under `name` in DETECTOR_PATTERNS.
+    """
+    return compile_pattern(*DETECTOR_PATTERNS[name])
+
+def set_phone_region(region):
+    """
+    Select the default region used to read phone numbers written without a +country code (e.g. 'US', 'GB').
+    """
+    global _phone_region
+    region = region.upper()
+    if region not in phonenumbers.SUPPORTED_REGIONS:
+        raise ValueError(f"Unknown phone region: {region}")
+    _phone_region = region
+
+def extension_codec(file_path):
+    """
+    Return the compression codec named by a file's extension, or None.
+    """
+    for codec, (extension, _) in COMPRESSION_CODECS.items():
+        if file_path.lower().endswith(extension):
+            return codec
+    return None
+
+def detect_codec(file_path):
+    """
+    Detect the compression codec of a file from its extension, falling back to its magic bytes
+    unless the extension is a plain text one. Returns None for uncompressed files.
+    """
+    codec = extension_codec(file_path)
+    if codec is not None or file_path.lower().endswith(TEXT_EXTENSIONS):
+        return codec
+
+    with open(file_path, 'rb') as f:
+        head = f.read(MAGIC_BYTES)
+    for codec, (_, magic) in COMPRESSION_CODECS.items():
+        if magic.match(head):
+            return codec
+    return None
+
+def strip_codec_extension(file_name):
     """
-    Initialize and return the SpaCy NLP pipeline with custom patterns for redaction.
-    Loads the pipeline only once (lazy loading) for efficiency.
+    Remove a trailing compression extension (e.g. '.gz') from a file name.
+    """
+    for extension, _ in COMPRESSION_CODECS.values():
+        if file_name.lower().endswith(extension):
+            return file_name[:-len(extension)]
+    return file_name
+
+def open_text(file_path, mode='r', codec=None, level=None, errors=None):
     """
-    if not hasattr(initialize_spacy_nlp, "nlp"):
+    Open a UTF-8 text stream over a plain or compressed file, (de)compressing on the fly.
+    `errors` is passed to the text decoder/encoder (strict by default).
+    """
+    options = {} if errors is None else {'errors': errors}
+    if codec is None:
+        return open(file_path, mode, encoding='utf-8', **options)
+
+    text_mode = mode + 't'
+    if codec == 'gz':
+        if level is not None:
+            options['compresslevel'] = level
+        return gzip.open(file_path, text_mode, encoding='utf-8', **options)
+    if codec == 'bz2':
+        if level is not None:
+            options['compresslevel'] = level
+        return bz2.open(file_path, text_mode, encoding='utf-8', **options)
+    if codec == 'xz':
+        if level is not None:
+            options['preset'] = level
+        return lzma.open(file_path, text_mode, encoding='utf-8', **options)
+    if codec == 'zst':
+        if zstandard is None:
+            raise RuntimeError("zstandard is required for .zst files. Install it with: pip install zstandard")
+        cctx = zstandard.ZstdCompressor(level=level) if level is not None else None
+        return zstandard.open(file_path, text_mode, cctx=cctx, encoding='utf-8', **options)
+    raise ValueError(f"Unknown compression codec: {codec}")
+
+def read_text(file_path):
+    """
+    Read a whole input file, transparently decompressing .gz, .bz2, .xz and .zst inputs.
+    A file whose codec was only guessed from its magic bytes is read as plain text if it fails to decompress.
+    """
+    codec = detect_codec(file_path)
+    try:
+        with open_text(file_path, 'r', codec) as f:
+            return f.read()
+    except Exception:
+        if codec is None or extension_codec(file_path) is not None:
+            raise
+    with open_text(file_path, 'r') as f:
+        return f.read()
+
+def write_text(file_path, text, codec=None, level=None):
+    """
+    Write text to a file, compressing it with the given codec when one is set.
+    Errors are reported on stderr rather than raised.
+    """
+    try:
+        with open_text(file_path, 'w', codec, level) as f:
+            f.write(text)
+    except Exception as e:
+        sys.stderr.write(f"Error writing to file {file_path}: {e}\n")
+
+def prefetch_texts(file_paths, io_pool, depth):
+    """
+    Yield (file_path, future) pairs, keeping up to `depth` reads in flight on the I/O pool
+    so decompression of upcoming files overlaps with detection on the current one.
+    """
+    pending = []
+    for file_path in file_paths:
+        pending.append((file_path, io_pool.submit(read_text, file_path)))
+        if len(pending) > depth:
+            yield pending.pop(0)
+    yield from pending
+
+def schedule_files(file_paths, strategy):
+    """
+    Order input files for processing: 'input' keeps the given order, 'shortest' runs the smallest files first.
+    """
+    if strategy != 'shortest':
+        return list(file_paths)
+
+    def file_size(file_path):
         try:
-            nlp = spacy.load('en_core_web_lg')
-            # Add entity ruler for custom patterns before the named entity recognizer (NER)
-            entity_ruler = nlp.add_pipe("entity_ruler", before="ner")
-            entity_ruler.add_patterns(PHONE_PATTERNS + DATE_PATTERNS + ADDRESS_PATTERNS + NAME_PATTERNS)
-            nlp.add_pipe('sentencizer')  # Adds sentence segmentation
-            initialize_spacy_nlp.nlp = nlp
-        except OSError as e:
-            sys.stderr.write(
-                "SpaCy model 'en_core_web_lg' not found. Install it with: python -m spacy download en_core_web_lg\n"
-            )
-            raise e
-    return initialize_spacy_nlp.nlp
-
-def initialize_hf_pipeline():
-    """
-    Initialize and return the Hugging Face NER pipeline for redaction.
-    Loads the pipeline only once for efficiency.
-    """
-    if not hasattr(initialize_hf_pipeline, "pipeline"):
-        tokenizer = AutoTokenizer.from_pretrained("dslim/bert-base-NER")
-        model = AutoModelForTokenClassification.from_pretrained("dslim/bert-base-NER")
-        initialize_hf_pipeline.pipeline = pipeline("ner", model=model, tokenizer=tokenizer, aggregation_strategy="simple")
-    return initialize_hf_pipeline.pipeline
+            return os.path.getsize(file_path)
+        except OSError:
+            return 0
+
+    return sorted(file_paths, key=file_size)
+
+def relative_path(file_path, root='.'):
+    """
+    Return a file's path relative to `root` with '/' separators, the same on every node sharing a corpus.
+    """
+    return os.path.relpath(file_path, root).replace(os.sep, '/')
+
+def shard_of(file_path, shard_count, root='.'):
+    """
+    Return the shard (0..shard_count-1) a file belongs to, from a hash of its path relative to `root`.
+    The assignment of a file never changes when other files are added or removed.
+    """
+    digest = hashlib.sha1(relative_path(file_path, root).encode('utf-8')).hexdigest()
+    return int(digest, 16) % shard_count
+
+def select_shard(file_paths, shard, root='.'):
+    """
+    Keep only the files that belong to `shard`, given as an (index, count) pair.
+    """
+    index, count = shard
+    return [file_path for file_path in file_paths if shard_of(file_path, count, root) == index]
+
+def document_deadline(doc_budget, run_deadline):
+    """
+    Return the monotonic deadline for the next document: its own budget, capped by what is left of the run.
+    """
+    deadlines = [run_deadline] if run_deadline is not None else []
+    if doc_budget:
+        deadlines.append(time.monotonic() + doc_budget)
+    return min(deadlines) if deadlines else None
+
+def iter_chunks(text, chunk_size, overlap=0):
+    """
+    Yield (offset, owned_end, chunk) pieces covering the text. Each chunk owns the characters
+    [offset, owned_end), which are at most chunk_size long and end after a newline or other
+    whitespace where possible, and extends `overlap` characters past owned_end for context.
+    """
+    start = 0
+    while start < len(text):
+        end = min(start + chunk_size, len(text))
+        if end < len(text):
+            newline = text.rfind('\n', start, end)
+            if newline > start:
+                end = newline + 1
+            else:
+                space = max(text.rfind(' ', start, end), text.rfind('\t', start, end))
+                if space > start:
+                    end = space + 1
+        yield start, end, text[start:end + overlap]
+        start = end
+
+def detect_in_chunks(text, find_spans, stats, deadline):
+    """
+    Run a detector over overlapping chunks of text, checking the deadline between chunks.
+    `find_spans(chunk)` returns (start, end, category) tuples. A span is kept only by the chunk
+    owning its start, and dropped when it starts inside a span kept by an earlier chunk (the tail of
+    an entity crossing the boundary), so entities across a boundary are neither lost nor counted twice.
+    Raises DeadlineExceeded with the spans found so far once the deadline passes.
+    """
+    redaction_spans = []
+    kept_end = 0
+    for offset, owned_end, chunk in iter_chunks(text, DEADLINE_CHUNK_SIZE, DEADLINE_CHUNK_OVERLAP):
+        if time.monotonic() >= deadline:
+            raise DeadlineExceeded(redaction_spans)
+        chunk_kept_end = kept_end
+        for start, end, category in find_spans(chunk):
+            start, end = start + offset, end + offset
+            if kept_end <= start < owned_end:
+                redaction_spans.append((start, end))
+                stats[category] += 1
+                chunk_kept_end = max(chunk_kept_end, end)
+        kept_end = chunk_kept_end
+    return redaction_spans
 
 def merge_overlapping_spans(spans):
     """
@@ -111,9 +654,9 @@ def identify_concept_sentences(text, concepts):
     Identify sentences that contain specified concepts to redact.
     """
     escaped_concepts = [re.escape(concept.lower()) for concept in concepts]
-    concept_pattern = re.compile(r'\b(' + '|'.join(escaped_concepts) + r')\b', re.IGNORECASE)
+    concept_pattern = compile_pattern(r'\b(' + '|'.join(escaped_concepts) + r')\b', re.IGNORECASE)
 
-    sentence_pattern = re.compile(r'.+?(?:[.!?](?=\s)|\n|$)', re.DOTALL)
+    sentence_pattern = detector_pattern('sentence')
     concept_spans = []
 
     for match in sentence_pattern.finditer(text):
@@ -123,52 +666,113 @@ def identify_concept_sentences(text, concepts):
 
     return concept_spans
 
-def redact_entities_spacy(text, targets, stats):
+def uses_labels(targets, label_mapping):
     """
-    Redact entities identified by SpaCy based on specified categories.
+    Check whether a model's label mapping covers any targeted category, so models that can't
+    contribute (e.g. for a phones-only run) are neither loaded nor run.
     """
-    nlp = initialize_spacy_nlp()
-    doc = nlp(text)
-    redaction_spans = []
-
-    # Mapping entity labels to redaction categories
-    label_mapping = {
-        'PERSON': 'names',
-        'DATE': 'dates',
-        'PHONE': 'phones',
-        'GPE': 'addresses',
-        'LOC': 'addresses'
-    }
+    return any(category in targets for category in label_mapping.values())
 
+def spacy_entity_spans(doc, targets):
+    """
+    Return (start_char, end_char, category) for the targeted entities of a processed SpaCy Doc.
+    """
+    entity_spans = []
     for ent in doc.ents:
-        category = label_mapping.get(ent.label_)
+        category = SPACY_LABEL_MAPPING.get(ent.label_)
         if category and category in targets:
-            redaction_spans.append((ent.start_char, ent.end_char))
-            stats[category] += 1
+            entity_spans.append((ent.start_char, ent.end_char, category))
+    return entity_spans
 
+def collect_spacy_spans(doc, targets, stats):
+    """
+    Collect redaction spans from the entities of a processed SpaCy Doc.
+    """
+    redaction_spans = []
+    for start, end, category in spacy_entity_spans(doc, targets):
+        redaction_spans.append((start, end))
+        stats[category] += 1
     return redaction_spans
 
-def redact_entities_hf(text, targets, stats):
+def redact_entities_spacy(text, targets, stats, deadline=None, profile='thorough'):
     """
-    Redact entities identified by Hugging Face NER based on target categories.
+    Redact entities identified by the profile's SpaCy pipeline based on specified categories.
+    With a deadline, the text is processed in overlapping chunks and DeadlineExceeded is raised once it passes.
     """
-    ner_pipeline = initialize_hf_pipeline()
-    ner_results = ner_pipeline(text)
-    redaction_spans = []
+    if not uses_labels(targets, SPACY_LABEL_MAPPING):
+        return []
+    nlp = initialize_spacy_nlp(profile)
+    if deadline is None:
+        return collect_spacy_spans(nlp(text), targets, stats)
+    return detect_in_chunks(text, lambda chunk: spacy_entity_spans(nlp(chunk), targets), stats, deadline)
 
-    hf_label_mapping = {
-        'PER': 'names',
-        'LOC': 'addresses'
-    }
+def redact_entities_spacy_batch(texts, targets, stats, batch_size=None, profile='thorough'):
+    """
+    Redact entities in many texts with a single batched SpaCy pass.
+    The batch size defaults to the profile's. Returns one list of spans per input text.
+    """
+    if not uses_labels(targets, SPACY_LABEL_MAPPING):
+        return [[] for _ in texts]
+    nlp = initialize_spacy_nlp(profile)
+    batch_size = batch_size or get_profile(profile)['spacy_batch_size']
+    return [collect_spacy_spans(doc, targets, stats) for doc in nlp.pipe(texts, batch_size=batch_size)]
 
+def hf_entity_spans(ner_results, targets):
+    """
+    Return (start, end, category) for the targeted entities in Hugging Face NER results.
+    """
+    entity_spans = []
     for entity in ner_results:
-        category = hf_label_mapping.get(entity['entity_group'])
+        category = HF_LABEL_MAPPING.get(entity['entity_group'])
         if category and category in targets:
-            redaction_spans.append((entity['start'], entity['end']))
-            stats[category] += 1
+            entity_spans.append((entity['start'], entity['end'], category))
+    return entity_spans
 
+def collect_hf_spans(ner_results, targets, stats):
+    """
+    Collect redaction spans from Hugging Face NER results.
+    """
+    redaction_spans = []
+    for start, end, category in hf_entity_spans(ner_results, targets):
+        redaction_spans.append((start, end))
+        stats[category] += 1
     return redaction_spans
 
+def redact_entities_hf(text, targets, stats, deadline=None, profile='thorough'):
+    """
+    Redact entities identified by Hugging Face NER based on target categories.
+    Profiles without a Hugging Face model find nothing.
+    With a deadline, the text is processed in overlapping chunks and DeadlineExceeded is raised once it passes.
+    """
+    if not uses_labels(targets, HF_LABEL_MAPPING):
+        return []
+    ner_pipeline = initialize_hf_pipeline(profile)
+    if ner_pipeline is None:
+        return []
+    if deadline is None:
+        return collect_hf_spans(ner_pipeline(text), targets, stats)
+
+    def find_spans(chunk):
+        return hf_entity_spans(ner_pipeline(chunk), targets) if chunk.strip() else []
+
+    return detect_in_chunks(text, find_spans, stats, deadline)
+
+def redact_entities_hf_batch(texts, targets, stats, batch_size=None, profile='thorough'):
+    """
+    Redact entities in many texts with batched Hugging Face NER.
+    Blank texts are skipped and the batch size defaults to the profile's.
+    Returns one list of spans per input text.
+    """
+    results = [[] for _ in texts]
+    indices = [i for i, text in enumerate(texts) if text.strip()]
+    ner_pipeline = initialize_hf_pipeline(profile) if indices and uses_labels(targets, HF_LABEL_MAPPING) else None
+    if ner_pipeline is not None:
+        batch_size = batch_size or get_profile(profile)['hf_batch_size']
+        ner_results = ner_pipeline([texts[i] for i in indices], batch_size=batch_size)
+        for i, entities in zip(indices, ner_results):
+            results[i] = collect_hf_spans(entities, targets, stats)
+    return results
+
 def redact_email_headers(text, targets, stats):
     """
     Redact names found in email headers.
@@ -178,22 +782,20 @@ def redact_email_headers(text, targets, stats):
     if 'names' not in targets:
         return redaction_spans
 
-    header_pattern = re.compile(
-        r'^(From|To|Cc|Bcc|X-From|X-To|X-cc|X-bcc):\s*(.*)',
-        re.IGNORECASE | re.MULTILINE
-    )
+    header_pattern = detector_pattern('header')
+    header_name_pattern = detector_pattern('header_name')
+    email_pattern = detector_pattern('header_email')
 
     for match in header_pattern.finditer(text):
         header_content = match.group(2)
 
-        name_matches = re.finditer(r'\b[A-Z][a-z]+(?:\s[A-Z][a-z]+)*\b', header_content)
+        name_matches = header_name_pattern.finditer(header_content)
         for name_match in name_matches:
             start = match.start(2) + name_match.start()
             end = match.start(2) + name_match.end()
             redaction_spans.append((start, end))
             stats['names'] += 1
 
-        email_pattern = re.compile(r'\b([\w\.-]+)@([\w\.-]+\.\w+)\b', re.IGNORECASE)
         for email_match in email_pattern.finditer(header_content):
             local_part = email_match.group(1)
             name_parts = re.split(r'[._]', local_part)
@@ -209,19 +811,220 @@ def redact_email_headers(text, targets, stats):
 
     return redaction_spans
 
-def redact_entities_regex(text, targets, stats):
+def iter_header_fields(header_block):
+    """
+    Yield (name, value_start, value_end) for each field of an email header block.
+    Folded continuation lines are included in the value of the field they continue.
+    """
+    field = None
+    pos = 0
+    for line in header_block.splitlines(keepends=True):
+        line_end = pos + len(line.rstrip('\r\n'))
+        if line[:1] in (' ', '\t') and field is not None:
+            field[2] = line_end
+        else:
+            if field is not None:
+                yield tuple(field)
+            field = None
+            name, separator, _ = line.partition(':')
+            if separator and name and not name[0].isspace():
+                field = [name.strip(), pos + len(name) + 1, line_end]
+        pos += len(line)
+    if field is not None:
+        yield tuple(field)
+
+def split_address_list(value):
+    """
+    Yield (offset, address) pieces of an address-list field value, splitting on commas
+    that are outside quoted strings, angle brackets and comments.
+    """
+    start = 0
+    depth = 0
+    quoted = False
+    escaped = False
+    for i, char in enumerate(value):
+        if escaped:
+            escaped = False
+        elif char == '\\':
+            escaped = True
+        elif char == '"':
+            quoted = not quoted
+        elif quoted:
+            continue
+        elif char in '<(':
+            depth += 1
+        elif char in '>)' and depth:
+            depth -= 1
+        elif char == ',' and not depth:
+            yield start, value[start:i]
+            start = i + 1
+    yield start, value[start:]
+
+def address_parts(address):
+    """
+    Return (offset, text) for the display name and local part of a single address,
+    located within the address's own text. Handles "Name <local@domain>",
+    "local@domain (Name)" and bare "local@domain" forms.
+    """
+    parts = []
+    angle = address.find('<')
+    if angle != -1:
+        close = address.find('>', angle)
+        mailbox_start, mailbox_text = angle + 1, address[angle + 1:close if close != -1 else len(address)]
+        parts.append((0, address[:angle]))
+    else:
+        comment = address.find('(')
+        mailbox_start, mailbox_text = 0, address[:comment] if comment != -1 else address
+        if comment != -1:
+            close = address.rfind(')')
+            parts.append((comment + 1, address[comment + 1:close if close > comment else len(address)]))
+
+    local_part = mailbox_text.rpartition('@')[0]
+    parts.append((mailbox_start, local_part))
+
+    located = []
+    for offset, text in parts:
+        stripped = text.strip()
+        if stripped:
+            located.append((offset + text.index(stripped), stripped))
+    return located
+
+def is_address_header(name):
+    """
+    Check whether a lower-cased header field name carries an address list.
+    """
+    return name in ADDRESS_HEADERS or name.startswith('resent-')
+
+def redact_header_values(header_block, targets, stats, concepts=None):
+    """
+    Redact the values of the header fields that don't carry addresses (Subject, Received, ...)
+    with the regex detectors and concept matching, as text mode would.
+    """
+    redaction_spans = []
+    for name, value_start, value_end in iter_header_fields(header_block):
+        if is_address_header(name.lower()):
+            continue
+        value = header_block[value_start:value_end].lstrip()
+        value_start = value_end - len(value)
+        value_spans = redact_entities_regex(value, targets, stats)
+        if concepts:
+            concept_spans = identify_concept_sentences(value, concepts)
+            value_spans.extend(concept_spans)
+            stats['concepts'] += len(concept_spans)
+        redaction_spans.extend((value_start + start, value_start + end) for start, end in value_spans)
+    return redaction_spans
+
+def redact_address_headers(header_block, targets, stats):
+    """
+    Redact display names and address local parts in the address-list fields of a parsed header block.
+    """
+    redaction_spans = []
+
+    if 'names' not in targets:
+        return redaction_spans
+
+    for name, value_start, value_end in iter_header_fields(header_block):
+        name = name.lower()
+        value = header_block[value_start:value_end]
+
+        if name == 'received':
+            for match in detector_pattern('received_for').finditer(value):
+                redaction_spans.append((value_start + match.start(1), value_start + match.end(1)))
+                stats['names'] += 1
+            continue
+        if not is_address_header(name):
+            continue
+
+        if '@' not in value:
+            # Display-name-only fields such as "X-From: Robert Badeer"
+            stripped = value.strip()
+            if stripped:
+                start = value_start + value.index(stripped)
+                redaction_spans.append((start, start + len(stripped)))
+                stats['names'] += 1
+            continue
+
+        for address_offset, address in split_address_list(value):
+            for part_offset, part in address_parts(address):
+                start = value_start + address_offset + part_offset
+                redaction_spans.append((start, start + len(part)))
+                stats['names'] += 1
+
+    return redaction_spans
+
+def is_phone_boundary(text, start, end):
+    """
+    Check that a phone number at text[start:end] isn't glued to a word, amount, path or longer digit run.
+    """
+    before = text[start - 1] if start else ' '
+    after = text[end] if end < len(text) else ' '
+    return not (before.isalnum() or before in PHONE_ADJACENT_REJECT or
+                after.isalnum() or after in PHONE_ADJACENT_REJECT)
+
+def find_phone_numbers(text, region=None):
+    """
+    Yield (start, end, E.164 number) for the phone numbers in the text.
+    A single pass finds candidate digit runs; only those are parsed and validated with phonenumbers,
+    reading numbers without a +country code as numbers of `region` (default: set_phone_region).
+    Formatted candidates must be possible numbers; bare digit runs, which are usually IDs, must be valid.
+    Candidates are split at runs of two or more spaces. They are also capped in length, so one may hold
+    several numbers or end mid-number: scanning resumes after the last number found in it, or after its
+    first space if none was, rather than after the candidate.
+    """
+    region = region or _phone_region
+    candidate_pattern = detector_pattern('phone_candidate')
+    pos = 0
+    while True:
+        match = candidate_pattern.search(text, pos)
+        if match is None:
+            return
+        start, end = match.span()
+        candidate = match.group()
+        last_end = None
+        # Runs of two or more spaces or tabs separate numbers rather than the groups of one number
+        for segment in re.finditer(r'[^ \t]+(?:[ \t][^ \t]+)*', candidate):
+            if sum(char.isdigit() for char in segment.group()) < PHONE_MIN_DIGITS:
+                continue
+            offset = start + segment.start()
+            for phone_match in PhoneNumberMatcher(segment.group(), region, leniency=Leniency.POSSIBLE):
+                phone_start, phone_end = offset + phone_match.start, offset + phone_match.end
+                if not is_phone_boundary(text, phone_start, phone_end):
+                    continue
+                formatted = any(char in PHONE_SEPARATORS for char in phone_match.raw_string)
+                if formatted or phonenumbers.is_valid_number(phone_match.number):
+                    last_end = phone_end
+                    yield (phone_start, phone_end,
+                           phonenumbers.format_number(phone_match.number, phonenumbers.PhoneNumberFormat.E164))
+        if last_end is not None:
+            pos = last_end
+        else:
+            space = re.search(r'[ \t]', candidate)
+            pos = start + space.end() if space else end
+
+def redact_phone_numbers(text, stats, region=None):
+    """
+    Redact phone numbers found by find_phone_numbers.
+    """
+    redaction_spans = []
+    for start, end, _ in find_phone_numbers(text, region):
+        redaction_spans.append((start, end))
+        stats['phones'] += 1
+    return redaction_spans
+
+def redact_entities_regex(text, targets, stats, phone_region=None):
     """
     Redact entities identified by regular expressions based on target categories.
+    Phone numbers are found by redact_phone_numbers, using `phone_region` for national formats.
     """
     redaction_spans = []
 
     if 'names' in targets:
-        name_pattern = re.compile(r'\b[A-Z][a-z]+(?:\s[A-Z][a-z]+)+\b')
+        name_pattern = detector_pattern('name')
         for match in name_pattern.finditer(text):
             redaction_spans.append((match.start(), match.end()))
             stats['names'] += 1
 
-        email_name_pattern = re.compile(r'\b([a-z]+(?:[\._][a-z]+)+)@[\w\.-]+\b', re.IGNORECASE)
+        email_name_pattern = detector_pattern('email_name')
         for match in email_name_pattern.finditer(text):
             local_part = match.group(1)
             name_parts = re.split(r'[._]', local_part)
@@ -235,32 +1038,16 @@ def redact_entities_regex(text, targets, stats):
                 current_pos += len(part) + 1
 
     if 'phones' in targets:
-        phone_pattern = re.compile(r'\b(\+?\d{1,2}[\s-])?(\(?\d{3}\)?[\s.-]?|\d{3}[\s.-]?)[\s.-]?\d{3}[\s.-]?\d{4}\b')
-        for match in phone_pattern.finditer(text):
-            redaction_spans.append((match.start(), match.end()))
-            stats['phones'] += 1
+        redaction_spans.extend(redact_phone_numbers(text, stats, phone_region))
 
     if 'dates' in targets:
-        date_pattern = re.compile(
-            r'\b(?:\d{1,2}[/-])?\d{1,2}[/-]\d{2,4}\b|'
-            r'\b(?:Jan(?:uary)?|Feb(?:ruary)?|Mar(?:ch)?|Apr(?:il)?|May|Jun(?:e)?|Jul(?:y)?|Aug(?:ust)?|'
-            r'Sep(?:tember)?|Oct(?:ober)?|Nov(?:ember)?|Dec(?:ember)?)\s\d{1,2},?\s\d{4}\b',
-            re.IGNORECASE
-        )
+        date_pattern = detector_pattern('date')
         for match in date_pattern.finditer(text):
             redaction_spans.append((match.start(), match.end()))
             stats['dates'] += 1
 
     if 'addresses' in targets:
-        address_pattern = re.compile(
-            r'('
-            r'\b\d{1,5}\s+(?:[A-Z][a-zA-Z]*(?:\s|$)){1,5}'
-            r'(?:Street|St\.?|Avenue|Ave\.?|Road|Rd\.?|Boulevard|Blvd\.?|' 
-            r'Lane|Ln\.?|Drive|Dr\.?|Court|Ct\.?|Highway|Hwy\.?|Place|Pl\.?|' 
-            r'Square|Sq\.?|Building|Bldg\.?|Apartment|Apt\.?|Suite|Ste\.?)?'
-            r')',
-            re.IGNORECASE | re.VERBOSE
-        )
+        address_pattern = detector_pattern('address')
         for match in address_pattern.finditer(text):
             redaction_spans.append((match.start(), match.end()))
             stats['addresses'] += 1
@@ -278,6 +1065,10 @@ def write_stats(stats, destination):
         f"Addresses redacted: {stats.get('addresses', 0)}\n"
         f"Concepts redacted: {stats.get('concepts', 0)}\n"
     )
+    if stats.get('degraded'):
+        stats_report += f"Degraded (time budget exhausted): {stats['degraded']}\n"
+        for degraded_path in stats.get('degraded_files', []):
+            stats_report += f"  {degraded_path}\n"
     if destination.lower() == 'stderr':
         sys.stderr.write(stats_report)
     elif destination.lower() == 'stdout':
@@ -289,17 +1080,118 @@ def write_stats(stats, destination):
         except Exception as e:
             sys.stderr.write(f"Failed to write statistics to {destination}: {e}\n")
 
-def process_file(file_path, args, stats):
+def new_stats():
     """
-    Process and redact a single text file.
+    Return an empty statistics dictionary.
+    """
+    stats = dict.fromkeys(STATS_COUNTERS, 0)
+    stats['degraded_files'] = []
+    return stats
+
+def add_stats(total, stats):
+    """
+    Add the counters and degraded paths of one statistics dictionary into another.
+    """
+    for counter in STATS_COUNTERS:
+        total[counter] += stats.get(counter, 0)
+    total['degraded_files'].extend(stats.get('degraded_files', []))
+
+def stats_json_report(stats, manifest):
+    """
+    Build the machine-readable stats report: corpus totals plus one manifest entry per input.
+    """
+    return {
+        'version': STATS_JSON_VERSION,
+        'totals': {counter: stats.get(counter, 0) for counter in STATS_COUNTERS},
+        'degraded_files': list(stats.get('degraded_files', [])),
+        'files': manifest,
+    }
+
+def manifest_entry(input_path, output_path, stats, root='.'):
     """
+    Describe one processed input for the per-file manifest of the JSON stats report. Besides the path as
+    given, the input is recorded relative to `root`, which stays the same across mount points.
+    """
+    return {
+        'input': input_path,
+        'relative_input': relative_path(input_path, root),
+        'output': output_path,
+        'counts': {counter: stats.get(counter, 0) for counter in STATS_COUNTERS},
+        'degraded': bool(stats.get('degraded')),
+    }
+
+def write_stats_json(report, destination):
+    """
+    Output a JSON stats report to the specified destination (stderr, stdout, or file).
+    """
+    content = json.dumps(report, indent=2, sort_keys=True) + '\n'
+    if destination.lower() == 'stderr':
+        sys.stderr.write(content)
+    elif destination.lower() == 'stdout':
+        sys.stdout.write(content)
+    else:
+        try:
+            with open(destination, 'w', encoding='utf-8') as f:
+                f.write(content)
+        except Exception as e:
+            sys.stderr.write(f"Failed to write statistics to {destination}: {e}\n")
+
+def merge_stats(reports):
+    """
+    Combine JSON stats reports (e.g. one per shard) into one corpus-wide report.
+    """
+    total = new_stats()
+    manifest = []
+    for report in reports:
+        if report.get('version') != STATS_JSON_VERSION:
+            raise ValueError(f"Unsupported stats report version: {report.get('version')}")
+        add_stats(total, dict(report['totals'], degraded_files=report.get('degraded_files', [])))
+        manifest.extend(report.get('files', []))
+
+    seen = set()
+    for entry in manifest:
+        # Reports written before relative paths were recorded only have the raw path
+        key = entry.get('relative_input', entry['input'])
+        if key in seen:
+            sys.stderr.write(f"Input appears in more than one stats report: {entry['input']}\n")
+        seen.add(key)
+
+    return stats_json_report(total, manifest)
+
+def merge_stats_main(argv):
+    """
+    Entry point for the merge-stats subcommand: sum per-shard JSON stats reports into one.
+    """
+    parser = argparse.ArgumentParser(
+        prog='redactor.py merge-stats',
+        description='Combine per-shard JSON statistics into corpus totals.'
+    )
+    parser.add_argument('reports', nargs='+', help='JSON stats files written with --stats-json')
+    parser.add_argument('--stats', default='stdout', help='Destination for the text report (stderr, stdout, or filepath)')
+    parser.add_argument('--stats-json', help='Destination for the merged JSON report (stderr, stdout, or filepath)')
+    args = parser.parse_args(argv)
+
+    reports = []
+    for report_path in args.reports:
+        try:
+            with open(report_path, 'r', encoding='utf-8') as f:
+                reports.append(json.load(f))
+        except Exception as e:
+            parser.error(f"cannot read stats report {report_path}: {e}")
+
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            text = f.read()
-    except Exception as e:
-        sys.stderr.write(f"Error reading file {file_path}: {e}\n")
-        return
+        merged = merge_stats(reports)
+    except (KeyError, ValueError) as e:
+        parser.error(f"invalid stats report: {e}")
 
+    write_stats(dict(merged['totals'], degraded_files=merged['degraded_files']), args.stats)
+    if args.stats_json:
+        write_stats_json(merged, args.stats_json)
+
+def get_targets(args):
+    """
+    Return the entity categories selected on the command line.
+    """
     entities_to_censor = []
     if args.names:
         entities_to_censor.append('names')
@@ -309,40 +1201,393 @@ def process_file(file_path, args, stats):
         entities_to_censor.append('phones')
     if args.address:
         entities_to_censor.append('addresses')
+    return entities_to_censor
+
+def apply_redactions(text, spans):
+    """
+    Replace every character inside the given merged spans with the redaction character, keeping newlines.
+    The output is assembled from slices, joined into blocks every REDACTION_BLOCK_PIECES pieces,
+    so neither a per-character list nor a per-span list of the whole document is held.
+    """
+    blocks = []
+    pieces = []
+    cursor = 0
+    for start_char, end_char in spans:
+        start_char = max(start_char, cursor)
+        if end_char <= start_char:
+            continue
+        pieces.append(text[cursor:start_char])
+        pieces.append('\n'.join('█' * len(line) for line in text[start_char:end_char].split('\n')))
+        cursor = end_char
+        if len(pieces) >= REDACTION_BLOCK_PIECES:
+            blocks.append(''.join(pieces))
+            pieces = []
+    pieces.append(text[cursor:])
+    blocks.append(''.join(pieces))
+    return ''.join(blocks)
+
+def censored_path(file_path, args, degraded=False):
+    """
+    Build the output path for an input file or mailbox, adding the output codec extension if any.
+    Degraded outputs are named <name>.degraded.censored so they can't be mistaken for complete ones.
+    """
+    base_name = strip_codec_extension(os.path.basename(os.path.normpath(file_path)))
+    suffix = '.degraded.censored' if degraded else '.censored'
+    censored_file_name = os.path.join(args.output, f"{base_name}{suffix}")
+    if args.compress:
+        censored_file_name += COMPRESSION_CODECS[args.compress][0]
+    return censored_file_name
+
+def process_file(file_path, args, stats, pending_text=None, io_pool=None, run_deadline=None):
+    """
+    Process and redact a single text file.
+    When an I/O pool is given, the input may already be loading in `pending_text`
+    and the output is compressed and written on the pool instead of inline.
+    The --doc-budget clock starts once the file has been read, capped by `run_deadline`.
+    If the NLP detectors run out of time, the file is degraded: it keeps the header and
+    regex redactions plus whatever the NLP detectors found in time, is written as
+    <name>.degraded.censored and is listed in stats['degraded_files'].
+    """
+    try:
+        text = pending_text.result() if pending_text is not None else read_text(file_path)
+    except Exception as e:
+        sys.stderr.write(f"Error reading file {file_path}: {e}\n")
+        return
+
+    entities_to_censor = get_targets(args)
+    deadline = document_deadline(args.doc_budget, run_deadline)
+    degraded = False
 
     spans_to_redact = []
     spans_to_redact.extend(redact_email_headers(text, entities_to_censor, stats))
-    spans_to_redact.extend(redact_entities_spacy(text, entities_to_censor, stats))
-    spans_to_redact.extend(redact_entities_hf(text, entities_to_censor, stats))
     spans_to_redact.extend(redact_entities_regex(text, entities_to_censor, stats))
 
+    try:
+        spans_to_redact.extend(redact_entities_spacy(text, entities_to_censor, stats, deadline=deadline,
+                                                     profile=args.profile))
+        spans_to_redact.extend(redact_entities_hf(text, entities_to_censor, stats, deadline=deadline,
+                                                  profile=args.profile))
+    except DeadlineExceeded as e:
+        spans_to_redact.extend(e.spans)
+        degraded = True
+        stats['degraded'] += 1
+        stats['degraded_files'].append(file_path)
+        sys.stderr.write(f"Degraded {file_path}: time budget exhausted, NLP detection incomplete\n")
+
     if args.concept:
         concept_spans = identify_concept_sentences(text, args.concept)
         spans_to_redact.extend(concept_spans)
         stats['concepts'] += len(concept_spans)
 
     merged_spans = merge_overlapping_spans(spans_to_redact)
+    final_text = apply_redactions(text, merged_spans)
 
-    redacted_text = list(text)
-    for start_char, end_char in merged_spans:
-        for i in range(start_char, end_char):
-            if redacted_text[i] != '\n':
-                redacted_text[i] = '█'
-    final_text = ''.join(redacted_text)
+    censored_file_name = censored_path(file_path, args, degraded)
 
-    base_name = os.path.basename(file_path)
-    censored_file_name = os.path.join(args.output, f"{base_name}.censored")
+    if io_pool is not None:
+        io_pool.submit(write_text, censored_file_name, final_text, args.compress, args.compress_level)
+    else:
+        write_text(censored_file_name, final_text, args.compress, args.compress_level)
+    return censored_file_name
+
+def iter_mbox_messages(file_path):
+    """
+    Stream (from_line, message) pairs out of a plain or compressed mbox file, one message at a time.
+    Undecodable bytes are replaced rather than aborting the archive.
+    """
+    from_line = ''
+    lines = []
+    with open_text(file_path, 'r', detect_codec(file_path), errors='replace') as f:
+        for line in f:
+            if line.startswith('From '):
+                if from_line or lines:
+                    yield from_line, ''.join(lines)
+                from_line = line
+                lines = []
+            else:
+                lines.append(line)
+    if from_line or lines:
+        yield from_line, ''.join(lines)
+
+def iter_maildir_messages(dir_path):
+    """
+    Yield (from_line, message) pairs for every message in a maildir, in key order,
+    escaped for writing into an mbox.
+    """
+    maildir = mailbox.Maildir(dir_path, factory=None, create=False)
+    for key in sorted(maildir.keys()):
+        # Maildir files are stored as written, often with CRLF line endings; mbox output uses LF
+        message = maildir.get_bytes(key).decode('utf-8', errors='replace').replace('\r\n', '\n')
+        message = re.sub(r'^(>*From )', r'>\1', message, flags=re.MULTILINE)
+        if not message.endswith('\n\n'):
+            message += '\n' if message.endswith('\n') else '\n\n'
+        yield f"From MAILER-DAEMON {time.asctime(time.gmtime())}\n", message
+
+def envelope_line(from_line):
+    """
+    Rewrite an mbox "From " envelope line so it no longer carries the sender address, keeping its date.
+    """
+    if not from_line:
+        return from_line
+    fields = from_line.split(None, 2)
+    date = fields[2].rstrip('\r\n') if len(fields) > 2 else time.asctime(time.gmtime())
+    return f"From MAILER-DAEMON {date}\n"
+
+def split_message(message):
+    """
+    Split a raw message into its header block (including the terminating newline) and its body.
+    """
+    header_end = re.search(r'\r?\n(?=\r?\n)', message)
+    if header_end is None:
+        return message, ''
+    return message[:header_end.end()], message[header_end.end():]
+
+def redact_message_batch(messages, args, targets, stats, run_deadline=None):
+    """
+    Redact a batch of raw email messages. Address headers are redacted structurally from the parsed
+    header block and the other header values go through the regex and concept detectors; only the
+    bodies go through the NLP detectors. Without time budgets the bodies are
+    processed in one batched pass per detector. With budgets, each body gets its own --doc-budget
+    (capped by `run_deadline`) and is processed on its own so one slow message can't stall the batch;
+    messages that run out of time are degraded and get an X-Redactor-Degraded header.
+    """
+    parts = [split_message(message) for message in messages]
+    bodies = [body for _, body in parts]
+
+    body_spans = [[] for _ in bodies]
+    degraded = [False] * len(bodies)
+    if args.doc_budget or run_deadline is not None:
+        for i, body in enumerate(bodies):
+            deadline = document_deadline(args.doc_budget, run_deadline)
+            try:
+                body_spans[i].extend(redact_entities_spacy(body, targets, stats, deadline=deadline,
+                                                           profile=args.profile))
+                body_spans[i].extend(redact_entities_hf(body, targets, stats, deadline=deadline,
+                                                        profile=args.profile))
+            except DeadlineExceeded as e:
+                body_spans[i].extend(e.spans)
+                degraded[i] = True
+                stats['degraded'] += 1
+    else:
+        for detector in (redact_entities_spacy_batch, redact_entities_hf_batch):
+            for spans, found in zip(body_spans, detector(bodies, targets, stats, profile=args.profile)):
+                spans.extend(found)
+
+    redacted_messages = []
+    for (header_block, body), spans, message_degraded in zip(parts, body_spans, degraded):
+        # Forwarded header blocks quoted inside the body
+        spans.extend(redact_email_headers(body, targets, stats))
+        spans.extend(redact_entities_regex(body, targets, stats))
+        if args.concept:
+            concept_spans = identify_concept_sentences(body, args.concept)
+            spans.extend(concept_spans)
+            stats['concepts'] += len(concept_spans)
+
+        header_spans = redact_address_headers(header_block, targets, stats)
+        header_spans.extend(redact_header_values(header_block, targets, stats, args.concept))
+        marker = "X-Redactor-Degraded: time budget exhausted\n" if message_degraded else ''
+        redacted_messages.append(
+            marker +
+            apply_redactions(header_block, merge_overlapping_spans(header_spans)) +
+            apply_redactions(body, merge_overlapping_spans(spans))
+        )
+    return redacted_messages
+
+def process_mailbox(path, args, stats, run_deadline=None):
+    """
+    Redact an mbox file or maildir directory message by message into a single output mbox.
+    Each message gets its own --doc-budget, capped by the run deadline; a mailbox with any
+    degraded message is listed in stats['degraded_files'].
+    """
+    degraded_before = stats['degraded']
+    targets = get_targets(args)
+    messages = iter_maildir_messages(path) if args.format == 'maildir' else iter_mbox_messages(path)
+    censored_file_name = censored_path(path, args)
 
     try:
-        with open(censored_file_name, 'w', encoding='utf-8') as f:
-            f.write(final_text)
+        with open_text(censored_file_name, 'w', args.compress, args.compress_level) as f:
+            while True:
+                batch = list(itertools.islice(messages, args.batch_size))
+                if not batch:
+                    break
+                messages_in_batch = [message for _, message in batch]
+                try:
+                    redacted = redact_message_batch(messages_in_batch, args, targets, stats, run_deadline)
+                except Exception:
+                    # Retry one message at a time so a single bad message doesn't take the batch with it
+                    redacted = []
+                    for message in messages_in_batch:
+                        try:
+                            redacted.extend(redact_message_batch([message], args, targets, stats, run_deadline))
+                        except Exception as e:
+                            sys.stderr.write(f"Skipping unredactable message in {path}: {e}\n")
+                            redacted.append(None)
+                for (from_line, _), message in zip(batch, redacted):
+                    if message is not None:
+                        f.write(envelope_line(from_line))
+                        f.write(message)
     except Exception as e:
-        sys.stderr.write(f"Error writing to file {censored_file_name}: {e}\n")
+        sys.stderr.write(f"Error processing mailbox {path}: {e}\n")
+
+    if stats['degraded'] > degraded_before:
+        stats['degraded_files'].append(path)
+        sys.stderr.write(f"Degraded {path}: {stats['degraded'] - degraded_before} message(s) ran out of time budget\n")
+    return censored_file_name
+
+class Redactor:
+    """
+    Reusable in-process redactor, configured once with the entity categories, concepts and NLP profile.
+
+        with Redactor(['names', 'phones'], profile='balanced') as redactor:
+            for result in redactor.redact_many(texts):
+                store(result.text, result.spans, result.stats)
+
+    Models are loaded on first use, or up front with load(), and released with close() once no other
+    open Redactor uses the same profile. A Redactor may be shared across threads: each call keeps its
+    own statistics, and the NLP pipelines, which are shared by every Redactor using the same profile,
+    are run one batch at a time.
+    """
+    def __init__(self, targets=TARGETS, concepts=(), profile='thorough', batch_size=32, phone_region=None):
+        unknown = set(targets) - set(TARGETS)
+        if unknown:
+            raise ValueError(f"Unknown targets: {', '.join(sorted(unknown))}. Choose from: {', '.join(TARGETS)}")
+        if batch_size < 1:
+            raise ValueError(f"batch_size must be at least 1, got {batch_size}")
+        get_profile(profile)
+        if phone_region is not None and phone_region.upper() not in phonenumbers.SUPPORTED_REGIONS:
+            raise ValueError(f"Unknown phone region: {phone_region}")
+        self.targets = list(targets)
+        self.concepts = list(concepts)
+        self.profile = profile
+        self.batch_size = batch_size
+        self.phone_region = phone_region and phone_region.upper()
+        self._uses_models = False
+
+    def _use_models(self):
+        if not (uses_labels(self.targets, SPACY_LABEL_MAPPING) or uses_labels(self.targets, HF_LABEL_MAPPING)):
+            return
+        with MODEL_LOCK:
+            if not self._uses_models:
+                _model_users[self.profile] = _model_users.get(self.profile, 0) + 1
+                self._uses_models = True
+
+    def load(self):
+        """
+        Load the profile's NLP pipelines the targets need now instead of on the first document.
+        """
+        self._use_models()
+        if uses_labels(self.targets, SPACY_LABEL_MAPPING):
+            initialize_spacy_nlp(self.profile)
+        if uses_labels(self.targets, HF_LABEL_MAPPING):
+            initialize_hf_pipeline(self.profile)
+        return self
+
+    def close(self):
+        """
+        Release the profile's NLP pipelines unless another open Redactor still uses them.
+        Using the Redactor again loads them again.
+        """
+        with MODEL_LOCK:
+            if not self._uses_models:
+                return
+            self._uses_models = False
+            _model_users[self.profile] -= 1
+            if not _model_users[self.profile]:
+                del _model_users[self.profile]
+                release_models(self.profile)
+
+    def __enter__(self):
+        return self.load()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def redact(self, text):
+        """
+        Return the redacted text.
+        """
+        return next(self.redact_many([text])).text
+
+    def redact_many(self, texts):
+        """
+        Lazily redact an iterable of texts, yielding a RedactionResult(text, spans, stats) per text in order.
+        Texts are pulled batch_size at a time and each batch goes through every detector in one pass.
+        """
+        texts = iter(texts)
+        while True:
+            batch = list(itertools.islice(texts, self.batch_size))
+            if not batch:
+                return
+            yield from self._redact_batch(batch)
+
+    def _redact_batch(self, texts):
+        doc_stats = [new_stats() for _ in texts]
+        doc_spans = [[] for _ in texts]
+
+        with MODEL_LOCK:
+            self._use_models()
+            settings = get_profile(self.profile)
+            if uses_labels(self.targets, SPACY_LABEL_MAPPING):
+                nlp = initialize_spacy_nlp(self.profile)
+                for spans, stats, doc in zip(doc_spans, doc_stats,
+                                             nlp.pipe(texts, batch_size=settings['spacy_batch_size'])):
+                    spans.extend(collect_spacy_spans(doc, self.targets, stats))
+            ner_pipeline = initialize_hf_pipeline(self.profile) if uses_labels(self.targets, HF_LABEL_MAPPING) else None
+            indices = [i for i, text in enumerate(texts) if text.strip()]
+            if ner_pipeline is not None and indices:
+                ner_results = ner_pipeline([texts[i] for i in indices], batch_size=settings['hf_batch_size'])
+                for i, entities in zip(indices, ner_results):
+                    doc_spans[i].extend(collect_hf_spans(entities, self.targets, doc_stats[i]))
+
+        for text, spans, stats in zip(texts, doc_spans, doc_stats):
+            spans.extend(redact_email_headers(text, self.targets, stats))
+            spans.extend(redact_entities_regex(text, self.targets, stats, self.phone_region))
+            if self.concepts:
+                concept_spans = identify_concept_sentences(text, self.concepts)
+                spans.extend(concept_spans)
+                stats['concepts'] += len(concept_spans)
+            merged_spans = merge_overlapping_spans(spans)
+            yield RedactionResult(apply_redactions(text, merged_spans), merged_spans, stats)
+
+def shard_spec(value):
+    """
+    Argparse type for --shard i/N, returning (i, N) with 0 <= i < N.
+    """
+    try:
+        index, count = (int(part) for part in value.split('/'))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected i/N, got {value}")
+    if count < 1 or not 0 <= index < count:
+        raise argparse.ArgumentTypeError(f"shard index must be in 0..N-1 with N >= 1, got {value}")
+    return index, count
+
+def positive_int(value):
+    """
+    Argparse type for integers that must be at least 1.
+    """
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {value}")
+    return number
+
+def positive_float(value):
+    """
+    Argparse type for numbers of seconds that must be greater than 0.
+    """
+    number = float(value)
+    if not number > 0:
+        raise argparse.ArgumentTypeError(f"must be greater than 0, got {value}")
+    return number
 
 def main():
     """
     Main function to parse arguments and initiate the redaction process.
+    `redactor.py merge-stats ...` combines per-shard JSON statistics instead.
     """
+    if sys.argv[1:2] == ['merge-stats']:
+        merge_stats_main(sys.argv[2:])
+        return
+
     parser = argparse.ArgumentParser(
         description='Redact sensitive information from text files.'
     )
@@ -354,26 +1599,87 @@ def main():
     parser.add_argument('--address', action='store_true', help='Enable redaction of addresses')
     parser.add_argument('--concept', action='append', help='Redact sentences containing specified concepts')
     parser.add_argument('--stats', required=True, help='Destination for statistics (stderr, stdout, or filepath)')
+    parser.add_argument('--stats-json', help='Destination for machine-readable JSON statistics with a per-file manifest')
+    parser.add_argument('--shard', type=shard_spec, help='Process only shard i of N (i/N), chosen by a hash of the relative path')
+    parser.add_argument('--shard-root', default='.', help='Directory that shard paths are taken relative to (default: cwd)')
+    parser.add_argument('--profile', default=os.environ.get('REDACTOR_PROFILE', 'thorough'),
+                        help='NLP accuracy/speed profile: fast, balanced or thorough (default: $REDACTOR_PROFILE or thorough)')
+    parser.add_argument('--profile-config', help='JSON file defining extra profiles or overriding the built-in ones')
+    parser.add_argument('--phone-region', default='US',
+                        help='Region for phone numbers written without a +country code, e.g. US or GB (default: US)')
+    parser.add_argument('--regex-engine', choices=REGEX_ENGINES, default='re',
+                        help='Regex engine for the detectors: re, re2 (linear time) or auto (re2 when installed)')
+    parser.add_argument('--compress', choices=sorted(COMPRESSION_CODECS), help='Compress redacted outputs with this codec')
+    parser.add_argument('--compress-level', type=int, help='Compression level for --compress (codec default if omitted)')
+    parser.add_argument('--format', choices=['text', 'mbox', 'maildir'], default='text',
+                        help='Input format: plain text files, mbox files or maildir directories')
+    parser.add_argument('--batch-size', type=positive_int, default=32, help='Messages per NLP batch in mbox/maildir mode')
+    parser.add_argument('--doc-budget', type=positive_float, help='Seconds of NLP detection allowed per document before degrading')
+    parser.add_argument('--run-budget', type=positive_float, help='Seconds allowed for the whole run; later documents degrade once spent')
+    parser.add_argument('--schedule', choices=['input', 'shortest'], default='input',
+                        help='Processing order: input order, or shortest files first')
+    parser.add_argument('--io-threads', type=int, default=0,
+                        help='Helper threads for reading, decompressing and compressing files alongside detection')
     args = parser.parse_args()
 
-    redaction_stats = {
-        'names': 0,
-        'dates': 0,
-        'phones': 0,
-        'addresses': 0,
-        'concepts': 0,
-    }
+    if args.compress_level is not None:
+        if not args.compress:
+            parser.error("--compress-level requires --compress")
+        low, high = COMPRESSION_LEVELS[args.compress]
+        if not low <= args.compress_level <= high:
+            parser.error(f"--compress-level for {args.compress} must be between {low} and {high}")
+
+    try:
+        set_regex_engine(args.regex_engine)
+        set_phone_region(args.phone_region)
+        if args.profile_config:
+            load_profiles(args.profile_config)
+        get_profile(args.profile)
+    except (OSError, RuntimeError, ValueError) as e:
+        parser.error(str(e))
 
+    redaction_stats = new_stats()
+    manifest = []
+
+    run_deadline = time.monotonic() + args.run_budget if args.run_budget else None
     os.makedirs(args.output, exist_ok=True)
 
+    input_files = []
     for pattern in args.input:
         matched_files = glob.glob(pattern)
         if not matched_files:
             sys.stderr.write(f"No files matched the pattern: {pattern}\n")
-        for file_path in matched_files:
-            process_file(file_path, args, redaction_stats)
+        input_files.extend(matched_files)
+    if args.shard:
+        input_files = select_shard(input_files, args.shard, args.shard_root)
+    input_files = schedule_files(input_files, args.schedule)
+
+    def record(input_path, output_path, file_stats):
+        add_stats(redaction_stats, file_stats)
+        if output_path is not None:
+            manifest.append(manifest_entry(input_path, output_path, file_stats, args.shard_root))
+
+    if args.format != 'text':
+        if args.io_threads > 0:
+            sys.stderr.write("--io-threads is ignored in mbox/maildir mode\n")
+        for path in input_files:
+            file_stats = new_stats()
+            record(path, process_mailbox(path, args, file_stats, run_deadline), file_stats)
+    elif args.io_threads > 0:
+        with ThreadPoolExecutor(max_workers=args.io_threads) as io_pool:
+            for file_path, pending_text in prefetch_texts(input_files, io_pool, args.io_threads):
+                file_stats = new_stats()
+                output_path = process_file(file_path, args, file_stats, pending_text=pending_text, io_pool=io_pool,
+                                           run_deadline=run_deadline)
+                record(file_path, output_path, file_stats)
+    else:
+        for file_path in input_files:
+            file_stats = new_stats()
+            record(file_path, process_file(file_path, args, file_stats, run_deadline=run_deadline), file_stats)
 
     write_stats(redaction_stats, args.stats)
+    if args.stats_json:
+        write_stats_json(stats_json_report(redaction_stats, manifest), args.stats_json)
 
 if __name__ == '__main__':
     main()
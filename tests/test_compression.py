@@ -0,0 +1,102 @@
+import bz2
+import gzip
+import lzma
+import os
+import tempfile
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import Mock, patch
+
+from redactor import detect_codec, process_file, read_text, strip_codec_extension, write_text, zstandard
+
+class TestCompression(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.text = "Call John Doe at 123-456-7890.\nThanks."
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def path(self, name):
+        return os.path.join(self.tmpdir.name, name)
+
+    def test_detect_codec_by_extension(self):
+        for codec, opener in (('gz', gzip.open), ('bz2', bz2.open), ('xz', lzma.open)):
+            file_path = self.path(f"report.txt.{codec}")
+            with opener(file_path, 'wt', encoding='utf-8') as f:
+                f.write(self.text)
+            self.assertEqual(detect_codec(file_path), codec)
+            self.assertEqual(read_text(file_path), self.text)
+
+    def test_detect_codec_by_magic_bytes(self):
+        file_path = self.path("report")
+        with gzip.open(file_path, 'wt', encoding='utf-8') as f:
+            f.write(self.text)
+        self.assertEqual(detect_codec(file_path), 'gz')
+        self.assertEqual(read_text(file_path), self.text)
+
+    def test_plain_text_starting_like_magic_bytes(self):
+        for name in ("notes.txt", "notes"):
+            file_path = self.path(name)
+            write_text(file_path, "BZhang Wei called at 9.")
+            self.assertIsNone(detect_codec(file_path))
+            self.assertEqual(read_text(file_path), "BZhang Wei called at 9.")
+
+    def test_sniffed_codec_falls_back_to_plain_read(self):
+        file_path = self.path("notes")
+        write_text(file_path, "BZh91AY&SY starts every bzip2 file.")
+        self.assertEqual(detect_codec(file_path), 'bz2')
+        self.assertEqual(read_text(file_path), "BZh91AY&SY starts every bzip2 file.")
+
+    def test_bz2_magic_bytes(self):
+        file_path = self.path("report")
+        with bz2.open(file_path, 'wt', encoding='utf-8') as f:
+            f.write(self.text)
+        self.assertEqual(detect_codec(file_path), 'bz2')
+        self.assertEqual(read_text(file_path), self.text)
+
+    def test_plain_file(self):
+        file_path = self.path("report.txt")
+        write_text(file_path, self.text)
+        self.assertIsNone(detect_codec(file_path))
+        self.assertEqual(read_text(file_path), self.text)
+
+    def test_write_with_level(self):
+        file_path = self.path("report.txt.censored.xz")
+        write_text(file_path, self.text, 'xz', 1)
+        with lzma.open(file_path, 'rt', encoding='utf-8') as f:
+            self.assertEqual(f.read(), self.text)
+
+    @unittest.skipIf(zstandard is None, "zstandard not installed")
+    def test_zstd_round_trip(self):
+        file_path = self.path("report.txt.zst")
+        write_text(file_path, self.text, 'zst', 3)
+        self.assertEqual(detect_codec(file_path), 'zst')
+        self.assertEqual(read_text(file_path), self.text)
+
+    def test_strip_codec_extension(self):
+        self.assertEqual(strip_codec_extension("1.txt.gz"), "1.txt")
+        self.assertEqual(strip_codec_extension("1.txt"), "1.txt")
+
+    @patch('redactor.redact_email_headers', return_value=[(5, 13)])
+    @patch('redactor.redact_entities_spacy', return_value=[])
+    @patch('redactor.redact_entities_hf', return_value=[])
+    @patch('redactor.redact_entities_regex', return_value=[])
+    def test_process_compressed_file_on_io_pool(self, mock_regex, mock_hf, mock_spacy, mock_headers):
+        input_path = self.path("1.txt.bz2")
+        with bz2.open(input_path, 'wt', encoding='utf-8') as f:
+            f.write(self.text)
+
+        args = Mock(names=True, dates=False, phones=False, address=False, concept=None,
+                    output=self.tmpdir.name, compress='gz', compress_level=6, doc_budget=None, profile='thorough')
+        stats = {'names': 0, 'dates': 0, 'phones': 0, 'addresses': 0, 'concepts': 0}
+
+        with ThreadPoolExecutor(max_workers=1) as io_pool:
+            pending_text = io_pool.submit(read_text, input_path)
+            process_file(input_path, args, stats, pending_text=pending_text, io_pool=io_pool)
+
+        with gzip.open(self.path("1.txt.censored.gz"), 'rt', encoding='utf-8') as f:
+            self.assertEqual(f.read(), "Call ████████ at 123-456-7890.\nThanks.")
+
+if __name__ == '__main__':
+    unittest.main()
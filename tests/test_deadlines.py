@@ -0,0 +1,129 @@
+import os
+import sys
+import tempfile
+import time
+import unittest
+from unittest.mock import Mock, patch
+
+import spacy
+
+from redactor import (DATE_PATTERNS, DeadlineExceeded, document_deadline, iter_chunks, main, process_file,
+                      redact_entities_spacy, redact_message_batch, schedule_files)
+
+def date_ruler_nlp(profile=None):
+    nlp = spacy.blank('en')
+    nlp.add_pipe('entity_ruler').add_patterns(DATE_PATTERNS)
+    return nlp
+
+def name_ruler_nlp(profile=None):
+    nlp = spacy.blank('en')
+    nlp.add_pipe('entity_ruler').add_patterns([{'label': 'PERSON', 'pattern': 'John Smith Adams'},
+                                               {'label': 'PERSON', 'pattern': 'Smith Adams'}])
+    return nlp
+
+class TestDeadlines(unittest.TestCase):
+    def setUp(self):
+        self.stats = {'names': 0, 'dates': 0, 'phones': 0, 'addresses': 0, 'concepts': 0,
+                      'degraded': 0, 'degraded_files': []}
+
+    def test_iter_chunks_splits_after_newlines(self):
+        text = "aaaa\nbbbb\ncccc"
+        chunks = list(iter_chunks(text, 7))
+        self.assertEqual(chunks, [(0, 5, "aaaa\n"), (5, 10, "bbbb\n"), (10, 14, "cccc")])
+
+    def test_iter_chunks_splits_on_whitespace_with_overlap(self):
+        text = "alpha beta gamma delta"
+        chunks = list(iter_chunks(text, 12, overlap=4))
+        self.assertEqual(chunks, [(0, 11, "alpha beta gamm"), (11, 22, "gamma delta")])
+
+    def test_document_deadline(self):
+        self.assertIsNone(document_deadline(None, None))
+        run_deadline = time.monotonic() + 1
+        self.assertEqual(document_deadline(60, run_deadline), run_deadline)
+        self.assertLess(document_deadline(0.5, run_deadline), run_deadline)
+
+    def test_schedule_shortest_first(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            paths = []
+            for name, size in (('big.txt', 30), ('small.txt', 10), ('medium.txt', 20)):
+                paths.append(os.path.join(tmpdir, name))
+                with open(paths[-1], 'w', encoding='utf-8') as f:
+                    f.write('x' * size)
+            self.assertEqual(schedule_files(paths, 'input'), paths)
+            self.assertEqual([os.path.basename(p) for p in schedule_files(paths, 'shortest')],
+                             ['small.txt', 'medium.txt', 'big.txt'])
+
+    @patch('redactor.DEADLINE_CHUNK_SIZE', 20)
+    @patch('redactor.initialize_spacy_nlp', side_effect=name_ruler_nlp)
+    def test_spacy_chunks_keep_boundary_entities_once(self, mock_nlp):
+        # The first chunk owns "Please we Met John " and keeps the whole name; the second chunk
+        # starts at "Smith Adams", the tail of that name, which must not be counted again
+        text = "Please we Met John Smith Adams. Then John Smith Adams left."
+        spans = redact_entities_spacy(text, ['names'], self.stats, deadline=time.monotonic() + 60)
+        self.assertEqual([text[start:end] for start, end in spans], ["John Smith Adams", "John Smith Adams"])
+        self.assertEqual(self.stats['names'], 2)
+
+    @patch('redactor.DEADLINE_CHUNK_SIZE', 20)
+    @patch('redactor.initialize_spacy_nlp', side_effect=date_ruler_nlp)
+    def test_spacy_chunks_keep_document_offsets(self, mock_nlp):
+        text = "Line one is here.\nCome on 06/14/2000 now.\n"
+        spans = redact_entities_spacy(text, ['dates'], self.stats, deadline=time.monotonic() + 60)
+        self.assertEqual([text[start:end] for start, end in spans], ["06/14/2000"])
+
+    @patch('redactor.initialize_spacy_nlp', side_effect=date_ruler_nlp)
+    def test_spacy_raises_when_deadline_passed(self, mock_nlp):
+        with self.assertRaises(DeadlineExceeded) as cm:
+            redact_entities_spacy("Come on 06/14/2000.", ['dates'], self.stats, deadline=time.monotonic() - 1)
+        self.assertEqual(cm.exception.spans, [])
+
+    @patch('redactor.sys.stderr')
+    @patch('redactor.redact_email_headers', return_value=[])
+    @patch('redactor.redact_entities_regex', return_value=[(0, 4)])
+    @patch('redactor.redact_entities_spacy', side_effect=DeadlineExceeded([(5, 8)]))
+    @patch('redactor.redact_entities_hf')
+    def test_process_file_degrades(self, mock_hf, mock_spacy, mock_regex, mock_headers, mock_stderr):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            input_path = os.path.join(tmpdir, 'slow.txt')
+            with open(input_path, 'w', encoding='utf-8') as f:
+                f.write("Call Bob now.")
+            args = Mock(names=True, dates=False, phones=False, address=False, concept=None,
+                        output=tmpdir, compress=None, compress_level=None, doc_budget=None, profile='thorough')
+
+            process_file(input_path, args, self.stats, run_deadline=time.monotonic())
+
+            self.assertFalse(os.path.exists(os.path.join(tmpdir, 'slow.txt.censored')))
+            with open(os.path.join(tmpdir, 'slow.txt.degraded.censored'), encoding='utf-8') as f:
+                self.assertEqual(f.read(), "████ ███ now.")
+        mock_hf.assert_not_called()
+        self.assertEqual(self.stats['degraded'], 1)
+        self.assertEqual(self.stats['degraded_files'], [input_path])
+        mock_stderr.write.assert_called_once_with(
+            f"Degraded {input_path}: time budget exhausted, NLP detection incomplete\n"
+        )
+
+    @patch('redactor.redact_entities_hf', return_value=[])
+    @patch('redactor.redact_entities_spacy')
+    def test_message_batch_budgets_each_message(self, mock_spacy, mock_hf):
+        mock_spacy.side_effect = [DeadlineExceeded([]), []]
+        args = Mock(names=True, dates=False, phones=False, address=False, concept=None, doc_budget=5,
+                    profile='thorough')
+        messages = ["Subject: slow\n\nslow body\n", "Subject: fast\n\nfast body\n"]
+
+        redacted = redact_message_batch(messages, args, ['names'], self.stats)
+
+        self.assertEqual(mock_spacy.call_count, 2)
+        for call in mock_spacy.call_args_list:
+            self.assertIsNotNone(call.kwargs['deadline'])
+        self.assertTrue(redacted[0].startswith("X-Redactor-Degraded: time budget exhausted\n"))
+        self.assertEqual(redacted[1], messages[1])
+        self.assertEqual(self.stats['degraded'], 1)
+
+    def test_budgets_must_be_positive(self):
+        for flag in ('--doc-budget', '--run-budget'):
+            test_args = ['redactor.py', '--input', '*.txt', '--output', 'out', '--stats', 'stdout', flag, '-1']
+            with patch.object(sys, 'argv', test_args), patch('sys.stderr'):
+                with self.assertRaises(SystemExit):
+                    main()
+
+if __name__ == '__main__':
+    unittest.main()
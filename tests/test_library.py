@@ -0,0 +1,74 @@
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+from redactor import Redactor, initialize_spacy_nlp
+
+class TestRedactor(unittest.TestCase):
+    def setUp(self):
+        self.redactor = Redactor(['names', 'phones'], profile='fast', batch_size=2)
+
+    def tearDown(self):
+        self.redactor.close()
+
+    def test_redact(self):
+        self.assertEqual(self.redactor.redact("Call 123-456-7890.\nBye."), "Call ████████████.\nBye.")
+
+    def test_redact_many_yields_spans_and_stats_per_document(self):
+        texts = ["Call 123-456-7890.", "Nothing here.", "Call 555-123-4567 or 987-654-3210."]
+        results = list(self.redactor.redact_many(texts))
+        self.assertEqual([result.spans for result in results], [[(5, 17)], [], [(5, 17), (21, 33)]])
+        self.assertEqual(results[1].stats['phones'], 0)
+        self.assertEqual([result.stats for result in results],
+                         [next(self.redactor.redact_many([text])).stats for text in texts])
+        self.assertEqual(results[1].text, "Nothing here.")
+
+    def test_redact_many_is_lazy(self):
+        pulled = []
+
+        def texts():
+            for i in range(5):
+                pulled.append(i)
+                yield f"Call 123-456-789{i}."
+
+        results = self.redactor.redact_many(texts())
+        self.assertEqual(pulled, [])
+        next(results)
+        self.assertEqual(pulled, [0, 1])
+        self.assertEqual(len(list(results)), 4)
+
+    def test_concepts(self):
+        redactor = Redactor([], concepts=['kids'], profile='fast')
+        [result] = redactor.redact_many(["The kids are asleep. Work is done."])
+        self.assertTrue(result.text.startswith("████"))
+        self.assertTrue(result.text.endswith("Work is done."))
+        self.assertEqual(result.stats['concepts'], 1)
+
+    def test_invalid_configuration_rejected(self):
+        for kwargs in ({'targets': ['ssn']}, {'profile': 'turbo'}, {'batch_size': 0}):
+            with self.assertRaises(ValueError):
+                Redactor(**kwargs)
+
+    def test_shared_across_threads(self):
+        texts = [f"Call 555-123-{i:04d} about item {i}." for i in range(40)]
+        expected = [self.redactor.redact(text) for text in texts]
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            self.assertEqual(list(pool.map(self.redactor.redact, texts)), expected)
+
+    def test_model_lifecycle(self):
+        with Redactor(profile='fast') as redactor:
+            self.assertIn('fast', initialize_spacy_nlp.pipelines)
+        self.assertNotIn('fast', initialize_spacy_nlp.pipelines)
+        self.assertEqual(redactor.redact("Call 123-456-7890."), "Call ████████████.")
+        redactor.close()
+
+    def test_close_keeps_models_used_by_other_redactors(self):
+        first = Redactor(profile='fast').load()
+        with Redactor(profile='fast') as second:
+            second.close()
+        self.assertIn('fast', initialize_spacy_nlp.pipelines)
+        self.assertEqual(first.redact("Call 123-456-7890."), "Call ████████████.")
+        first.close()
+        self.assertNotIn('fast', initialize_spacy_nlp.pipelines)
+
+if __name__ == '__main__':
+    unittest.main()
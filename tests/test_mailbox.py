@@ -0,0 +1,190 @@
+import mailbox
+import os
+import sys
+import tempfile
+import unittest
+from unittest.mock import Mock, patch
+
+from redactor import (envelope_line, iter_header_fields, iter_maildir_messages, iter_mbox_messages, main,
+                      process_mailbox, redact_address_headers, redact_header_values, split_message)
+
+MBOX = (
+    "From alice@example.com Mon Jan  1 00:00:00 2001\n"
+    "From: Alice Smith <alice.smith@example.com>\n"
+    "To: bob@example.com,\n"
+    " \"Doe, John\" <jdoe@example.com>\n"
+    "Subject: Lunch\n"
+    "\n"
+    "See you at noon.\n"
+    "\n"
+    "From bob@example.com Mon Jan  1 00:05:00 2001\n"
+    "From: bob@example.com\n"
+    "X-From: Bob Jones\n"
+    "Subject: Re: Lunch\n"
+    "\n"
+    "Sounds good.\n"
+    "\n"
+)
+
+class TestMailbox(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.stats = {'names': 0, 'dates': 0, 'phones': 0, 'addresses': 0, 'concepts': 0,
+                      'degraded': 0, 'degraded_files': []}
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_iter_header_fields_folds_continuation_lines(self):
+        header_block = "To: a@x.com,\n b@x.com\nSubject: Hi\n"
+        fields = [(name, header_block[start:end]) for name, start, end in iter_header_fields(header_block)]
+        self.assertEqual(fields, [('To', ' a@x.com,\n b@x.com'), ('Subject', ' Hi')])
+
+    def test_redact_address_headers(self):
+        header_block = "From: Alice Smith <alice.smith@example.com>\nX-From: Bob Jones\nSubject: Alice Smith\n"
+        spans = redact_address_headers(header_block, ['names'], self.stats)
+        self.assertEqual([header_block[start:end] for start, end in spans], ['Alice Smith', 'alice.smith', 'Bob Jones'])
+        self.assertEqual(self.stats['names'], 3)
+
+    def test_redact_address_headers_comment_and_quoted_forms(self):
+        header_block = (
+            "From: alice.smith@example.com (Alice Smith)\n"
+            "To: \"O\\\"Brien, Pat\" <pat@example.com>, carol@example.com\n"
+        )
+        spans = redact_address_headers(header_block, ['names'], self.stats)
+        self.assertEqual([header_block[start:end] for start, end in spans],
+                         ['Alice Smith', 'alice.smith', '"O\\"Brien, Pat"', 'pat', 'carol'])
+
+    def test_redact_address_headers_envelope_fields(self):
+        header_block = (
+            "Return-Path: <alice.smith@example.com>\n"
+            "Delivered-To: bob@example.com\n"
+            "Resent-From: Carol <carol@example.com>\n"
+            "Received: from mx.example.com\n"
+            " by mail.example.com for <dave@example.com>; Mon, 1 Jan 2001\n"
+        )
+        spans = redact_address_headers(header_block, ['names'], self.stats)
+        self.assertEqual([header_block[start:end] for start, end in spans],
+                         ['alice.smith', 'bob', 'Carol', 'carol', 'dave'])
+
+    def test_envelope_line_drops_sender(self):
+        self.assertEqual(envelope_line("From alice@example.com Mon Jan  1 00:00:00 2001\n"),
+                         "From MAILER-DAEMON Mon Jan  1 00:00:00 2001\n")
+
+    def test_iter_mbox_messages_tolerates_8bit_bytes(self):
+        mbox_path = os.path.join(self.tmpdir.name, 'latin1.mbox')
+        with open(mbox_path, 'wb') as f:
+            f.write(b"From a@x.com Mon Jan  1 00:00:00 2001\nSubject: Caf\xe9\n\nHi\n\n")
+        [(_, message)] = list(iter_mbox_messages(mbox_path))
+        self.assertEqual(message, "Subject: Caf\ufffd\n\nHi\n\n")
+
+    def test_batch_size_must_be_positive(self):
+        test_args = ['redactor.py', '--input', '*.mbox', '--output', self.tmpdir.name, '--stats', 'stdout',
+                     '--format', 'mbox', '--batch-size', '0']
+        with patch.object(sys, 'argv', test_args), patch('sys.stderr'):
+            with self.assertRaises(SystemExit):
+                main()
+
+    def test_redact_address_headers_without_names_target(self):
+        self.assertEqual(redact_address_headers("From: Alice <a@x.com>\n", ['dates'], self.stats), [])
+
+    def test_iter_mbox_messages(self):
+        mbox_path = os.path.join(self.tmpdir.name, 'archive.mbox')
+        with open(mbox_path, 'w', encoding='utf-8') as f:
+            f.write(MBOX)
+        messages = list(iter_mbox_messages(mbox_path))
+        self.assertEqual(len(messages), 2)
+        self.assertEqual(''.join(from_line + message for from_line, message in messages), MBOX)
+
+    def test_iter_maildir_messages(self):
+        maildir = mailbox.Maildir(os.path.join(self.tmpdir.name, 'maildir'))
+        maildir.add("From: a@x.com\n\nFrom here on.\n")
+        [(from_line, message)] = list(iter_maildir_messages(maildir._path))
+        self.assertTrue(from_line.startswith('From MAILER-DAEMON '))
+        self.assertEqual(message, "From: a@x.com\n\n>From here on.\n\n")
+
+    @patch('redactor.redact_entities_hf_batch', side_effect=lambda texts, *_, **__: [[] for _ in texts])
+    @patch('redactor.redact_entities_spacy_batch', side_effect=lambda texts, *_, **__: [[] for _ in texts])
+    def test_process_mailbox(self, mock_spacy_batch, mock_hf_batch):
+        mbox_path = os.path.join(self.tmpdir.name, 'archive.mbox')
+        with open(mbox_path, 'w', encoding='utf-8') as f:
+            f.write(MBOX)
+        args = Mock(names=True, dates=False, phones=False, address=False, concept=None, format='mbox',
+                    batch_size=1, doc_budget=None, profile='thorough', output=self.tmpdir.name, compress=None,
+                    compress_level=None)
+
+        process_mailbox(mbox_path, args, self.stats)
+
+        with open(os.path.join(self.tmpdir.name, 'archive.mbox.censored'), encoding='utf-8') as f:
+            redacted = f.read()
+        self.assertNotIn("alice", redacted)
+        self.assertNotIn("From bob@", redacted)
+        self.assertEqual(redacted.count("From MAILER-DAEMON Mon Jan  1"), 2)
+        self.assertIn("From: ███████████ <███████████@example.com>", redacted)
+        self.assertIn("X-From: █████████\n", redacted)
+        self.assertIn("To: ███@example.com,\n ███████████ <████@example.com>\n", redacted)
+        self.assertIn("Subject: Lunch\n\nSee you at noon.", redacted)
+        self.assertEqual(mock_spacy_batch.call_count, 2)
+        self.assertEqual(mock_spacy_batch.call_args[0][0], ["\nSounds good.\n\n"])
+
+    @patch('redactor.redact_entities_hf_batch', side_effect=lambda texts, *_, **__: [[] for _ in texts])
+    @patch('redactor.redact_entities_spacy_batch', side_effect=lambda texts, *_, **__: [[] for _ in texts])
+    def test_process_crlf_maildir_redacts_body_and_subject(self, mock_spacy_batch, mock_hf_batch):
+        maildir_path = os.path.join(self.tmpdir.name, 'maildir')
+        mailbox.Maildir(maildir_path)
+        with open(os.path.join(maildir_path, 'new', '1.eml'), 'wb') as f:
+            f.write(b"From: Robert Badeer <robert.badeer@example.com>\r\n"
+                    b"Subject: Call Robert Badeer at 202-555-0173 on 05/20/2021\r\n"
+                    b"\r\n"
+                    b"Hi, call Mary Jones at 202-555-0174 on 05/20/2021.\r\n")
+        args = Mock(names=True, dates=True, phones=True, address=False, concept=None, format='maildir',
+                    batch_size=1, doc_budget=None, profile='thorough', output=self.tmpdir.name, compress=None,
+                    compress_level=None)
+
+        process_mailbox(maildir_path, args, self.stats)
+
+        with open(os.path.join(self.tmpdir.name, 'maildir.censored'), encoding='utf-8') as f:
+            redacted = f.read()
+        self.assertNotIn("\r", redacted)
+        self.assertIn("Subject: ██████████████████ at ████████████ on ██████████\n\n", redacted)
+        self.assertIn("Hi, call ██████████ at ████████████ on ██████████.\n", redacted)
+        self.assertEqual(mock_spacy_batch.call_args[0][0], ["\nHi, call Mary Jones at 202-555-0174 on 05/20/2021.\n\n"])
+
+    def test_split_message_handles_crlf(self):
+        self.assertEqual(split_message("Subject: Hi\r\n\r\nBody\r\n"), ("Subject: Hi\r\n", "\r\nBody\r\n"))
+
+    def test_redact_header_values(self):
+        header_block = "From: Alice <a@x.com>\nSubject: Call Robert Badeer at 202-555-0173\nX-Note: kids\n"
+        spans = redact_header_values(header_block, ['names', 'phones'], self.stats, concepts=['kids'])
+        self.assertEqual([header_block[start:end] for start, end in spans], ['Call Robert Badeer', '202-555-0173', 'kids'])
+        self.assertEqual((self.stats['names'], self.stats['phones'], self.stats['concepts']), (1, 1, 1))
+
+    @patch('redactor.sys.stderr')
+    @patch('redactor.redact_entities_hf_batch', side_effect=lambda texts, *_, **__: [[] for _ in texts])
+    @patch('redactor.redact_entities_spacy_batch', side_effect=lambda texts, *_, **__: [[] for _ in texts])
+    def test_process_mailbox_skips_only_the_failing_message(self, mock_spacy_batch, mock_hf_batch, mock_stderr):
+        mbox_path = os.path.join(self.tmpdir.name, 'archive.mbox')
+        with open(mbox_path, 'w', encoding='utf-8') as f:
+            f.write(MBOX)
+        args = Mock(names=True, dates=False, phones=False, address=False, concept=None, format='mbox',
+                    batch_size=2, doc_budget=None, profile='thorough', output=self.tmpdir.name, compress=None,
+                    compress_level=None)
+
+        def fail_on_lunch(text, targets, stats):
+            if 'noon' in text:
+                raise ValueError("bad body")
+            return []
+
+        with patch('redactor.redact_entities_regex', side_effect=fail_on_lunch):
+            process_mailbox(mbox_path, args, self.stats)
+
+        with open(os.path.join(self.tmpdir.name, 'archive.mbox.censored'), encoding='utf-8') as f:
+            redacted = f.read()
+        self.assertNotIn("noon", redacted)
+        self.assertIn("Sounds good.", redacted)
+        mock_stderr.write.assert_called_once_with(
+            f"Skipping unredactable message in {mbox_path}: bad body\n"
+        )
+
+if __name__ == '__main__':
+    unittest.main()
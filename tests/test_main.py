@@ -59,8 +59,26 @@ class TestMainFunction(unittest.TestCase):
         with patch.object(sys, 'argv', test_args):
             main()
             mock_glob.assert_called_with('*.txt')
-            mock_process_file.assert_called_once_with('sample1.txt', unittest.mock.ANY, unittest.mock.ANY)
+            mock_process_file.assert_called_once_with('sample1.txt', unittest.mock.ANY, unittest.mock.ANY, run_deadline=None)
             mock_write_stats.assert_called_once()
 
+    @patch('redactor.process_file')
+    def test_main_rejects_out_of_range_compress_level(self, mock_process_file):
+        test_args = ['redactor.py', '--input', '*.txt', '--output', 'redacted_files', '--stats', 'stdout',
+                     '--compress', 'gz', '--compress-level', '12']
+        with patch.object(sys, 'argv', test_args), patch('sys.stderr'):
+            with self.assertRaises(SystemExit):
+                main()
+        mock_process_file.assert_not_called()
+
+    @patch('redactor.process_file')
+    def test_main_rejects_compress_level_without_codec(self, mock_process_file):
+        test_args = ['redactor.py', '--input', '*.txt', '--output', 'redacted_files', '--stats', 'stdout',
+                     '--compress-level', '3']
+        with patch.object(sys, 'argv', test_args), patch('sys.stderr'):
+            with self.assertRaises(SystemExit):
+                main()
+        mock_process_file.assert_not_called()
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,186 @@
+# tests/test_memory.py
+#
+# Peak-memory regression benchmark for the redaction path. process_file and each stage it runs
+# (read, detectors, span merging, redaction, write) are measured over synthetic documents with
+# stub SpaCy and Hugging Face models, so only the redactor's own allocations are counted.
+# Each stage's tracemalloc peak is reported in bytes per input byte, together with the peak RSS
+# sampled from a background thread, and the tracemalloc figure must stay within the budget recorded
+# in tests/memory_budgets.json.
+#
+# REDACTOR_MEMORY_SIZES sets the input sizes (comma-separated, with K/M/G suffixes, default 1M;
+# up to 1G on a machine with the memory for it). REDACTOR_MEMORY_REPORT writes the measurements
+# as JSON. REDACTOR_MEMORY_RECORD=1 records new budgets from the measurements instead of checking them.
+
+import json
+import os
+import tempfile
+import threading
+import time
+import tracemalloc
+import unittest
+from collections import namedtuple
+from unittest.mock import Mock, patch
+
+from redactor import (apply_redactions, identify_concept_sentences, merge_overlapping_spans, new_stats, process_file,
+                      read_text, redact_email_headers, redact_entities_hf, redact_entities_regex,
+                      redact_entities_spacy, write_text)
+
+BUDGETS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'memory_budgets.json')
+# Headroom over the measured ratio when recording budgets
+RECORD_HEADROOM = 1.25
+
+PARAGRAPH = ("From: John Smith <john.smith@example.com>\n"
+             "Hi Mary Johnson, call me at 123-456-7890 before March 3, 2021. The kids are at 221 Baker Street.\n"
+             "Order 4815162342 totals $1,234.56 and ships 2023-08-01.\n\n")
+TARGETS = ['names', 'dates', 'phones', 'addresses']
+
+def parse_size(value):
+    units = {'K': 2 ** 10, 'M': 2 ** 20, 'G': 2 ** 30}
+    value = value.strip().upper()
+    if value[-1:] in units:
+        return int(float(value[:-1]) * units[value[-1]])
+    return int(value)
+
+SIZES = [parse_size(size) for size in os.environ.get('REDACTOR_MEMORY_SIZES', '1M').split(',')]
+
+def synthetic_document(size):
+    return (PARAGRAPH * (size // len(PARAGRAPH) + 1))[:size]
+
+StubEntity = namedtuple('StubEntity', ['start_char', 'end_char', 'label_'])
+
+def find_all(text, needle):
+    start = text.find(needle)
+    while start != -1:
+        yield start, start + len(needle)
+        start = text.find(needle, start + 1)
+
+class StubDoc:
+    def __init__(self, text):
+        self.ents = [StubEntity(start, end, 'PERSON') for start, end in find_all(text, 'Mary Johnson')]
+
+class StubNlp:
+    """
+    Stands in for a SpaCy pipeline: finds one fixed name per paragraph without a model.
+    """
+    def __call__(self, text):
+        return StubDoc(text)
+
+    def pipe(self, texts, batch_size=None):
+        return (StubDoc(text) for text in texts)
+
+def stub_hf_pipeline(text):
+    return [{'entity_group': 'PER', 'start': start, 'end': end} for start, end in find_all(text, 'John Smith')]
+
+class RssSampler:
+    """
+    Samples the process resident set size from a background thread and keeps the peak.
+    """
+    def __init__(self, interval=0.005):
+        self.interval = interval
+        self.page_size = os.sysconf('SC_PAGE_SIZE') if hasattr(os, 'sysconf') else 4096
+        self.peak = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def rss(self):
+        try:
+            with open('/proc/self/statm', 'r') as f:
+                return int(f.read().split()[1]) * self.page_size
+        except OSError:
+            return 0
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.peak = max(self.peak, self.rss())
+            time.sleep(self.interval)
+
+    def __enter__(self):
+        self.start = self.rss()
+        self.peak = self.start
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stop.set()
+        self._thread.join()
+        self.peak = max(self.peak, self.rss())
+
+def measure(func):
+    """
+    Run func and return (result, traced peak bytes, RSS peak bytes above the starting RSS).
+    """
+    tracemalloc.start()
+    try:
+        baseline = tracemalloc.get_traced_memory()[0]
+        with RssSampler() as rss:
+            result = func()
+        peak = tracemalloc.get_traced_memory()[1] - baseline
+    finally:
+        tracemalloc.stop()
+    return result, peak, rss.peak - rss.start
+
+@patch('redactor.initialize_hf_pipeline', return_value=stub_hf_pipeline)
+@patch('redactor.initialize_spacy_nlp', return_value=StubNlp())
+class TestPeakMemory(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.record = os.environ.get('REDACTOR_MEMORY_RECORD') == '1'
+        with open(BUDGETS_PATH, 'r', encoding='utf-8') as f:
+            cls.budgets = json.load(f)
+        cls.report = {}
+
+    @classmethod
+    def tearDownClass(cls):
+        if cls.record:
+            with open(BUDGETS_PATH, 'w', encoding='utf-8') as f:
+                json.dump(cls.budgets, f, indent=2, sort_keys=True)
+                f.write('\n')
+        report_path = os.environ.get('REDACTOR_MEMORY_REPORT')
+        if report_path:
+            with open(report_path, 'w', encoding='utf-8') as f:
+                json.dump(cls.report, f, indent=2)
+
+    def check(self, size, stage, func):
+        result, peak, rss_peak = measure(func)
+        ratio = peak / size
+        self.report.setdefault(str(size), {})[stage] = {
+            'peak_bytes': peak, 'bytes_per_input_byte': round(ratio, 3), 'rss_peak_bytes': rss_peak}
+        if self.record:
+            self.budgets[stage] = max(self.budgets.get(stage, 0), round(ratio * RECORD_HEADROOM, 2))
+        else:
+            with self.subTest(size=size, stage=stage):
+                self.assertLessEqual(ratio, self.budgets[stage],
+                                     f"{stage} peaked at {ratio:.2f} bytes per input byte on {size} bytes")
+        return result
+
+    def test_stages(self, mock_nlp, mock_hf):
+        for size in SIZES:
+            with tempfile.TemporaryDirectory() as tmpdir:
+                input_path = os.path.join(tmpdir, 'input.txt')
+                write_text(input_path, synthetic_document(size))
+                text = self.check(size, 'read_text', lambda: read_text(input_path))
+
+                stats = new_stats()
+                spans = []
+                spans += self.check(size, 'redact_email_headers', lambda: redact_email_headers(text, TARGETS, stats))
+                spans += self.check(size, 'redact_entities_regex', lambda: redact_entities_regex(text, TARGETS, stats))
+                spans += self.check(size, 'redact_entities_spacy', lambda: redact_entities_spacy(text, TARGETS, stats))
+                spans += self.check(size, 'redact_entities_hf', lambda: redact_entities_hf(text, TARGETS, stats))
+                spans += self.check(size, 'identify_concept_sentences',
+                                    lambda: identify_concept_sentences(text, ['kids']))
+                merged = self.check(size, 'merge_overlapping_spans', lambda: merge_overlapping_spans(spans))
+                del spans
+                redacted = self.check(size, 'apply_redactions', lambda: apply_redactions(text, merged))
+                self.check(size, 'write_text', lambda: write_text(os.path.join(tmpdir, 'out.txt'), redacted))
+
+    def test_process_file(self, mock_nlp, mock_hf):
+        for size in SIZES:
+            with tempfile.TemporaryDirectory() as tmpdir:
+                input_path = os.path.join(tmpdir, 'input.txt')
+                write_text(input_path, synthetic_document(size))
+                args = Mock(names=True, dates=True, phones=True, address=True, concept=['kids'], output=tmpdir,
+                            compress=None, compress_level=None, doc_budget=None, profile='thorough')
+                self.check(size, 'process_file', lambda: process_file(input_path, args, new_stats()))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,13 +1,16 @@
+import sys
+
 import pytest
-from redactor import redact_entities_spacy, redact_entities_regex
+from unittest.mock import patch
+
+from redactor import find_phone_numbers, main, redact_entities_regex, redact_entities_spacy, redact_phone_numbers
 
-def test_redact_phone_numbers_spacy():
+def test_redact_phone_numbers_detector():
     text = "Call me at 123-456-7890."
-    targets = ["phones"]
     stats = {"phones": 0}
-    redacted_spans = redact_entities_spacy(text, targets, stats)
+    redacted_spans = redact_phone_numbers(text, stats)
     assert stats["phones"] == 1
-    assert all(text[start:end] == "123-456-7890" for start, end in redacted_spans)
+    assert [text[start:end] for start, end in redacted_spans] == ["123-456-7890"]
 
 def test_redact_phone_numbers_regex():
     text = "Contact me at (123) 456-7890 or 987.654.3210."
@@ -15,3 +18,39 @@ def test_redact_phone_numbers_regex():
     stats = {"phones": 0}
     redacted_spans = redact_entities_regex(text, targets, stats)
     assert stats["phones"] == 2
+
+def test_phone_numbers_normalized():
+    text = "Call +1 202-555-0173, 1-800-555-0199 or 2025550173."
+    assert [number for _, _, number in find_phone_numbers(text)] == ["+12025550173", "+18005550199", "+12025550173"]
+
+def test_ids_and_amounts_not_phones():
+    text = ("Order 4815162342 totals $1,234.56 and ships 2023-08-01. "
+            "Reference 2021-0045-778, invoice INV-5551234567 and file /tmp/555-123-4567.")
+    assert list(find_phone_numbers(text)) == []
+
+@pytest.mark.parametrize("text, expected", [
+    ("Call 202-555-0173 202-555-0174", ["202-555-0173", "202-555-0174"]),
+    ("202 555 0173  202 555 0174", ["202 555 0173", "202 555 0174"]),
+    ("(352) 555-0101 (352) 555-0102", ["(352) 555-0101", "(352) 555-0102"]),
+    ("2021 2022 2023 202-555-0173", ["202-555-0173"]),
+    ("12345678901234567890 202-555-0173", ["202-555-0173"]),
+])
+def test_adjacent_phone_numbers(text, expected):
+    assert [text[start:end] for start, end, _ in find_phone_numbers(text)] == expected
+
+def test_phone_region():
+    text = "Ring 020 7946 0958 or +1 202-555-0173."
+    assert [text[start:end] for start, end, _ in find_phone_numbers(text, 'US')] == ["+1 202-555-0173"]
+    assert [number for _, _, number in find_phone_numbers(text, 'GB')] == ["+442079460958", "+12025550173"]
+
+def test_phones_only_skips_nlp_models():
+    with patch('redactor.initialize_spacy_nlp') as mock_nlp:
+        assert redact_entities_spacy("Call 123-456-7890.", ["phones"], {"phones": 0}) == []
+    mock_nlp.assert_not_called()
+
+def test_main_rejects_unknown_phone_region():
+    test_args = ['redactor.py', '--input', '*.txt', '--output', 'out', '--stats', 'stdout', '--phone-region', 'XX']
+    with patch.object(sys, 'argv', test_args), patch('sys.stderr'), patch('redactor.process_file') as mock_process:
+        with pytest.raises(SystemExit):
+            main()
+    mock_process.assert_not_called()
@@ -31,6 +31,10 @@ class TestProcessFile(unittest.TestCase):
         args.address = True
         args.concept = None
         args.output = tempfile.gettempdir()
+        args.compress = None
+        args.compress_level = None
+        args.doc_budget = None
+        args.profile = 'thorough'
 
         # Initialize stats with all keys
         stats = {
@@ -42,7 +46,7 @@ class TestProcessFile(unittest.TestCase):
         }
 
         # Create a temporary input file
-        input_file = tempfile.NamedTemporaryFile(delete=False, mode='w', encoding='utf-8')
+        input_file = tempfile.NamedTemporaryFile(delete=False, mode='w', encoding='utf-8', suffix='.txt')
         input_file.write("Original content")
         input_file.close()
 
@@ -82,6 +86,10 @@ class TestProcessFile(unittest.TestCase):
         args.address = True
         args.concept = None
         args.output = tempfile.gettempdir()
+        args.compress = None
+        args.compress_level = None
+        args.doc_budget = None
+        args.profile = 'thorough'
 
         # Initialize stats
         stats = {
@@ -0,0 +1,72 @@
+import json
+import os
+import sys
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from redactor import (PROFILE_SETTINGS, PROFILES, get_profile, initialize_hf_pipeline, load_profiles, main,
+                      redact_entities_hf, redact_entities_hf_batch, redact_entities_spacy,
+                      redact_entities_spacy_batch)
+
+class TestProfiles(unittest.TestCase):
+    def setUp(self):
+        self.stats = {'names': 0, 'dates': 0, 'phones': 0, 'addresses': 0, 'concepts': 0}
+
+    def test_profiles_declare_every_setting(self):
+        for name in ('fast', 'balanced', 'thorough'):
+            self.assertEqual(set(get_profile(name)), set(PROFILE_SETTINGS))
+
+    def test_unknown_profile_rejected(self):
+        with self.assertRaises(ValueError):
+            get_profile('turbo')
+
+    def test_fast_profile_runs_rules_without_models(self):
+        text = "We met on 06/14/2000."
+        spans = redact_entities_spacy(text, ['dates'], self.stats, profile='fast')
+        self.assertEqual([text[start:end] for start, end in spans], ["06/14/2000"])
+        self.assertEqual(self.stats['dates'], 1)
+
+    def test_fast_profile_batches(self):
+        texts = ["Met on 06/14/2000.", "Nothing here.", "Or 07/15/2001."]
+        results = redact_entities_spacy_batch(texts, ['dates'], self.stats, profile='fast')
+        self.assertEqual([len(spans) for spans in results], [1, 0, 1])
+
+    def test_fast_profile_skips_hugging_face(self):
+        self.assertIsNone(initialize_hf_pipeline('fast'))
+        self.assertEqual(redact_entities_hf("John Smith lives here.", ['names'], self.stats, profile='fast'), [])
+        self.assertEqual(redact_entities_hf_batch(["John Smith.", ""], ['names'], self.stats, profile='fast'),
+                         [[], []])
+
+    @patch.dict('redactor.PROFILES', PROFILES.copy())
+    def test_load_profiles_overrides_and_extends(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            config_path = os.path.join(tmpdir, 'profiles.json')
+            with open(config_path, 'w', encoding='utf-8') as f:
+                json.dump({'thorough': {'hf_batch_size': 4},
+                           'medium': {'base': 'balanced', 'spacy_model': 'en_core_web_md'}}, f)
+            load_profiles(config_path)
+        self.assertEqual(get_profile('thorough')['hf_batch_size'], 4)
+        self.assertEqual(get_profile('thorough')['hf_model'], 'dslim/bert-base-NER')
+        self.assertEqual(get_profile('medium')['spacy_model'], 'en_core_web_md')
+        self.assertIsNone(get_profile('medium')['hf_model'])
+
+    @patch.dict('redactor.PROFILES', PROFILES.copy())
+    def test_load_profiles_rejects_incomplete_profile(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            config_path = os.path.join(tmpdir, 'profiles.json')
+            with open(config_path, 'w', encoding='utf-8') as f:
+                json.dump({'custom': {'spacy_model': None, 'spacy_batchsize': 8}}, f)
+            with self.assertRaises(ValueError):
+                load_profiles(config_path)
+
+    @patch('redactor.process_file')
+    def test_main_rejects_unknown_profile(self, mock_process_file):
+        test_args = ['redactor.py', '--input', '*.txt', '--output', 'out', '--stats', 'stdout', '--profile', 'turbo']
+        with patch.object(sys, 'argv', test_args), patch('sys.stderr'):
+            with self.assertRaises(SystemExit):
+                main()
+        mock_process_file.assert_not_called()
+
+if __name__ == '__main__':
+    unittest.main()
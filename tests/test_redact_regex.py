@@ -18,7 +18,7 @@ class TestRedactEntitiesRegex(unittest.TestCase):
         self.assertEqual(self.stats, {'names': 0, 'dates': 0, 'phones': 0, 'addresses': 0, 'concepts': 0})
     
     def test_overlapping_matches(self):
-        text = "Johnathan Doe's phone is 1234567890 and he lives at 123 Main St."
+        text = "Johnathan Doe's phone is 2025550173 and he lives at 123 Main St."
         expected_spans = [
             (0, 13),    
             (56, 63),   
@@ -0,0 +1,51 @@
+import re
+import unittest
+
+import redactor
+from redactor import compile_pattern, redact_entities_regex, set_regex_engine, to_re2_syntax
+
+class TestRegexEngine(unittest.TestCase):
+    def tearDown(self):
+        set_regex_engine('re')
+
+    def test_default_engine_is_re(self):
+        self.assertIsInstance(compile_pattern(r'\d+'), re.Pattern)
+
+    def test_to_re2_syntax_uses_unicode_classes(self):
+        self.assertEqual(to_re2_syntax(r'\d[\w.]'), r'[\p{Nd}][\p{L}\p{N}_.]')
+        self.assertEqual(to_re2_syntax(r'[]\d]\\d'), r'[]\p{Nd}]\\d')
+
+    def test_unknown_engine_rejected(self):
+        with self.assertRaises(ValueError):
+            set_regex_engine('pcre')
+
+    @unittest.skipIf(redactor.re2 is None, "google-re2 not installed")
+    def test_re2_engine_with_fallback(self):
+        set_regex_engine('re2')
+        self.assertNotIsInstance(compile_pattern(r'\b\d{3}\b'), re.Pattern)
+        # Lookarounds are not supported by RE2 and fall back to re
+        self.assertIsInstance(compile_pattern(r'a(?=b)'), re.Pattern)
+        # RE2's \b is ASCII-only, so word-boundary patterns switch to re on non-ASCII text
+        pattern = compile_pattern(r'\b[A-Z][a-z]+\b')
+        self.assertEqual(pattern.findall("John"), ["John"])
+        self.assertEqual(pattern.findall("\xc9John"), [])
+
+    @unittest.skipIf(redactor.re2 is None, "google-re2 not installed")
+    def test_engines_agree(self):
+        ascii_text = (
+            "Contact John Doe at john.doe@example.com or (123) 456-7890.\n"
+            "Meeting on 05/20/2021 at 530 Broadway, San Diego, CA 92101."
+        )
+        texts = [ascii_text, ascii_text.replace("John Doe", "John\xa0Doe"), "\xc9John Smith and \xe9Mary Jones agreed."]
+        targets = ['names', 'phones', 'dates', 'addresses']
+        for text in texts:
+            with self.subTest(text=text):
+                results = []
+                for engine in ('re', 're2'):
+                    set_regex_engine(engine)
+                    stats = {'names': 0, 'dates': 0, 'phones': 0, 'addresses': 0, 'concepts': 0}
+                    results.append((redact_entities_regex(text, targets, stats), stats))
+                self.assertEqual(results[0], results[1])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,83 @@
+# tests/test_regex_fuzz.py
+#
+# Worst-case latency benchmark for the detector regular expressions. Each pattern is run over
+# adversarial inputs (near-miss repetitions and seeded random mixes of the characters the patterns
+# care about) with every available engine, and must stay within a per-MB time budget.
+# REDACTOR_FUZZ_BYTES sets the input size and REDACTOR_REGEX_BUDGET the budget in seconds per MB.
+
+import os
+import random
+import re
+import time
+import unittest
+
+import redactor
+from redactor import DETECTOR_PATTERNS, NAME_PATTERNS, detector_pattern, set_regex_engine
+
+FUZZ_BYTES = int(os.environ.get('REDACTOR_FUZZ_BYTES', 64 * 1024))
+SECONDS_PER_MB_BUDGET = float(os.environ.get('REDACTOR_REGEX_BUDGET', 3.0))
+
+FRAGMENTS = ['1', '12345', '123', '4567', ' ', '  ', '-', '.', '(', ')', '+', '/', ',', '@', '_', '\n',
+             'A', 'Aa', 'Abc', 'abc', 'Street', 'St.', 'Jan', 'January', 'From:', 'To:', 'a.b', 'x_y', '\xa0']
+
+def repeat_to(fragment, size):
+    return (fragment * (size // len(fragment) + 1))[:size]
+
+def adversarial_inputs(size):
+    """
+    Yield (label, text) inputs built to make backtracking engines rescan or explore many paths.
+    """
+    yield 'capitalized_words', repeat_to('Aa ', size)
+    yield 'address_without_suffix', repeat_to('12345 ' + 'Abc ' * 5 + 'x ', size)
+    yield 'digit_runs', repeat_to('1 ', size)
+    yield 'partial_phones', repeat_to('123-456-', size)
+    yield 'dotted_local_parts', repeat_to('a.', size)
+    yield 'underscored_local_parts', repeat_to('a_b.', size)
+    yield 'long_words', repeat_to('A' + 'a' * 200 + '1', size)
+    yield 'header_lines', repeat_to('From: ' + 'Abc ' * 50 + '\n', size)
+    yield 'no_punctuation', repeat_to('word ', size)
+    for seed in range(3):
+        rng = random.Random(seed)
+        yield f'random_{seed}', ''.join(rng.choice(FRAGMENTS) for _ in range(size))[:size]
+
+def seconds_per_mb(callable_, text):
+    start = time.perf_counter()
+    callable_(text)
+    return (time.perf_counter() - start) / (len(text) / 2 ** 20)
+
+class TestRegexWorstCaseLatency(unittest.TestCase):
+    def tearDown(self):
+        set_regex_engine('re')
+
+    def check_engine(self, engine):
+        set_regex_engine(engine)
+        for name in DETECTOR_PATTERNS:
+            pattern = detector_pattern(name)
+            for label, text in adversarial_inputs(FUZZ_BYTES):
+                with self.subTest(engine=engine, pattern=name, input=label):
+                    rate = seconds_per_mb(lambda t: sum(1 for _ in pattern.finditer(t)), text)
+                    self.assertLess(rate, SECONDS_PER_MB_BUDGET)
+
+    def test_re_engine(self):
+        self.check_engine('re')
+
+    @unittest.skipIf(redactor.re2 is None, "google-re2 not installed")
+    def test_re2_engine(self):
+        self.check_engine('re2')
+
+    def test_name_pattern_token_regexes(self):
+        # The entity ruler evaluates these REGEX attributes on every token
+        token_patterns = [
+            re.compile(token[attr]['REGEX'])
+            for pattern in NAME_PATTERNS for token in pattern['pattern']
+            for attr in token if isinstance(token[attr], dict) and 'REGEX' in token[attr]
+        ]
+        for label, text in adversarial_inputs(FUZZ_BYTES):
+            tokens = text.lower().split()
+            for token_pattern in token_patterns:
+                with self.subTest(pattern=token_pattern.pattern, input=label):
+                    rate = seconds_per_mb(lambda _: [token_pattern.search(token) for token in tokens], text)
+                    self.assertLess(rate, SECONDS_PER_MB_BUDGET)
+
+if __name__ == '__main__':
+    unittest.main()
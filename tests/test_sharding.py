@@ -0,0 +1,88 @@
+import json
+import os
+import sys
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from redactor import main, manifest_entry, merge_stats, new_stats, select_shard, shard_of, stats_json_report
+
+class TestSharding(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.root = self.tmpdir.name
+        self.inputs = os.path.join(self.root, 'inputs')
+        os.makedirs(self.inputs)
+        self.paths = []
+        for i in range(12):
+            self.paths.append(os.path.join(self.inputs, f"doc{i}.txt"))
+            with open(self.paths[-1], 'w', encoding='utf-8') as f:
+                f.write(f"Call 123-456-7890 about item {i}.\n")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_shards_partition_the_corpus(self):
+        shards = [select_shard(self.paths, (i, 3), self.root) for i in range(3)]
+        self.assertEqual(sorted(sum(shards, [])), sorted(self.paths))
+
+    def test_shard_assignment_is_stable_under_additions(self):
+        before = {path: shard_of(path, 4, self.root) for path in self.paths}
+        extra = os.path.join(self.inputs, 'new.txt')
+        after = {path: shard_of(path, 4, self.root) for path in self.paths + [extra]}
+        for path, shard in before.items():
+            self.assertEqual(after[path], shard)
+
+    def test_shard_assignment_ignores_mount_point(self):
+        self.assertEqual(shard_of('/mnt/a/corpus/x.txt', 7, '/mnt/a'), shard_of('/srv/b/corpus/x.txt', 7, '/srv/b'))
+
+    def test_invalid_shard_rejected(self):
+        for spec in ('3/3', '1', 'a/b', '0/0'):
+            test_args = ['redactor.py', '--input', '*.txt', '--output', 'out', '--stats', 'stdout', '--shard', spec]
+            with patch.object(sys, 'argv', test_args), patch('sys.stderr'):
+                with self.assertRaises(SystemExit):
+                    main()
+
+    def test_merge_stats_rejects_unknown_version(self):
+        with self.assertRaises(ValueError):
+            merge_stats([{'version': 99, 'totals': {}}])
+
+    def test_merge_stats_spots_duplicates_across_mount_points(self):
+        reports = []
+        for root in ('/mnt/a', '/srv/b'):
+            entry = manifest_entry(f"{root}/corpus/x.txt", 'out/x.txt.censored', new_stats(), root)
+            reports.append(stats_json_report(new_stats(), [entry]))
+        self.assertEqual(reports[0]['files'][0]['relative_input'], 'corpus/x.txt')
+        with patch('sys.stderr') as mock_stderr:
+            merge_stats(reports)
+        mock_stderr.write.assert_called_once_with("Input appears in more than one stats report: /srv/b/corpus/x.txt\n")
+
+    @patch('redactor.redact_entities_hf', return_value=[])
+    @patch('redactor.redact_entities_spacy', return_value=[])
+    def test_shard_runs_merge_to_corpus_totals(self, mock_spacy, mock_hf):
+        output = os.path.join(self.root, 'output')
+        shard_reports = []
+        for i in range(3):
+            shard_reports.append(os.path.join(self.root, f"shard{i}.json"))
+            test_args = ['redactor.py', '--input', os.path.join(self.inputs, '*.txt'), '--output', output,
+                         '--phones', '--stats', os.path.join(self.root, f"shard{i}.txt"),
+                         '--stats-json', shard_reports[-1], '--shard', f"{i}/3", '--shard-root', self.root]
+            with patch.object(sys, 'argv', test_args):
+                main()
+
+        merged_path = os.path.join(self.root, 'merged.json')
+        test_args = ['redactor.py', 'merge-stats', *shard_reports,
+                     '--stats', os.path.join(self.root, 'merged.txt'), '--stats-json', merged_path]
+        with patch.object(sys, 'argv', test_args):
+            main()
+
+        with open(merged_path, encoding='utf-8') as f:
+            merged = json.load(f)
+        self.assertEqual(sorted(entry['input'] for entry in merged['files']), sorted(self.paths))
+        self.assertEqual(merged['totals']['phones'], len(self.paths))
+        self.assertEqual(len(os.listdir(output)), len(self.paths))
+        with open(os.path.join(self.root, 'merged.txt'), encoding='utf-8') as f:
+            self.assertIn(f"Phone numbers redacted: {len(self.paths)}\n", f.read())
+
+if __name__ == '__main__':
+    unittest.main()